@@ -1,8 +1,12 @@
+import asyncio
 import base64
 import hashlib
 import logging
 import os
-from datetime import datetime
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
 
 from models.schemas import IngestResult
 from processors import (
@@ -31,26 +35,168 @@ MODALITY_MAP = {
     ".eml": "text",
     ".ics": "calendar",
 }
+# Dotless lookup table so detect_modality is one rpartition + dict get
+_MODALITY_BY_EXT = {ext.lstrip("."): m for ext, m in MODALITY_MAP.items()}
+
+
+# Cap concurrent file preparations: each in-flight file holds its decoded
+# bytes plus extracted text in memory, so unbounded gather on a large batch
+# can OOM and thrash the extractors.
+_ingest_semaphore = asyncio.Semaphore(int(os.getenv("INGEST_CONCURRENCY", "8")))
+
+INGESTED_HASHES_SQL = """
+CREATE TABLE IF NOT EXISTS ingested_hashes (
+    user_id TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    description TEXT NOT NULL,
+    category TEXT NOT NULL,
+    has_events INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT (datetime('now')),
+    PRIMARY KEY (user_id, content_hash)
+);
+"""
+
+
+async def _lookup_ingested_hash(content_hash: str, user_id: str) -> dict | None:
+    """Find a previous ingest of the same bytes for this user."""
+    # Rides notif_service's shared connection instead of opening (and pragma-
+    # configuring) a fresh one per ingest; get_db also handles file: URIs.
+    db = await notif_service.get_db()
+    await db.execute(INGESTED_HASHES_SQL)
+    cursor = await db.execute(
+        """
+        SELECT doc_id, description, category, has_events
+        FROM ingested_hashes
+        WHERE user_id = ? AND content_hash = ?
+        """,
+        (user_id, content_hash),
+    )
+    row = await cursor.fetchone()
+    if row is None:
+        return None
+    return {
+        "doc_id": row[0],
+        "description": row[1],
+        "category": row[2],
+        "has_events": bool(row[3]),
+    }
+
+
+async def _record_ingested_hash(
+    content_hash: str,
+    doc_id: str,
+    description: str,
+    category: str,
+    has_events: bool,
+    user_id: str,
+) -> None:
+    """Remember this ingest so identical bytes skip the pipeline next time."""
+    db = await notif_service.get_db()
+    await db.execute(INGESTED_HASHES_SQL)
+    await db.execute(
+        """
+        INSERT OR REPLACE INTO ingested_hashes
+            (user_id, content_hash, doc_id, description, category, has_events)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (user_id, content_hash, doc_id, description, category, int(has_events)),
+    )
+    await db.commit()
+
+
+# Cheap lexical gate before the event-extraction LLM call: most files
+# (screenshots, memes, plain notes) contain nothing date-like, and a
+# microsecond regex scan is far cheaper than an Ollama round-trip that
+# would just answer "no events".
+DATE_RE = re.compile(
+    r"\b(?:"
+    r"\d{4}-\d{2}-\d{2}"  # 2025-03-14
+    r"|\d{1,2}/\d{1,2}/\d{2,4}"  # 3/14/25, 14/03/2025
+    r"|(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{1,2}"
+    r"|\d{1,2}(?:st|nd|rd|th)?\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*"
+    r"|today|tonight|tomorrow|next\s+\w+"
+    # weekday names and their common abbreviations ("due Friday", "on Mon")
+    r"|(?:mon|tue(?:s)?|wed(?:nes)?|thu(?:rs?)?|fri|sat(?:ur)?|sun)(?:day)?\b"
+    r"|at\s+\d{1,2}(?::\d{2})?\s*(?:am|pm)"
+    r"|\d{1,2}:\d{2}"  # bare times like 14:30
+    r")",
+    re.IGNORECASE,
+)
+
+# Emptiness probe that stops at the first non-whitespace char instead of
+# allocating a stripped copy of a potentially multi-MB extract.
+_NON_WS = re.compile(r"\S").search
+
+# Ingest timestamps only need second resolution, so cache the formatted
+# string per second instead of building a datetime for every file in a batch.
+_ts_cache: tuple[int, str] = (0, "")
+
+
+def _now_iso() -> str:
+    """Current UTC time as an ISO string, cached per second."""
+    global _ts_cache
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache = (
+            now,
+            datetime.fromtimestamp(now, tz=timezone.utc).isoformat(),
+        )
+    return _ts_cache[1]
 
 
 def detect_modality(filename: str) -> str:
     """Determine file type from extension."""
-    ext = os.path.splitext(filename)[1].lower()
-    return MODALITY_MAP.get(ext, "text")
+    return _MODALITY_BY_EXT.get(filename.rpartition(".")[2].lower(), "text")
+
+
+# Extraction for these modalities is CPU-bound parsing with no model state,
+# so it can run in worker processes and parallelize across cores.  Image and
+# audio extraction hold lazily loaded model singletons (BLIP, Whisper); a
+# worker process would reload those weights, so they run in a thread instead.
+_PROCESS_MODALITIES = frozenset({"pdf", "text", "calendar"})
+
+_extract_pool: ProcessPoolExecutor | None = None
+
+
+def _get_extract_pool() -> ProcessPoolExecutor:
+    """Lazy process pool for CPU-bound extraction (created on first use)."""
+    global _extract_pool
+    if _extract_pool is None:
+        _extract_pool = ProcessPoolExecutor(
+            max_workers=int(os.getenv("EXTRACT_WORKERS", str(os.cpu_count() or 2)))
+        )
+    return _extract_pool
+
+
+async def _extract_content_async(
+    file_bytes: bytes, filename: str, modality: str
+) -> str:
+    """Run extract_content off the event loop so ingestion doesn't stall I/O."""
+    if modality in _PROCESS_MODALITIES:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _get_extract_pool(), extract_content, file_bytes, filename, modality
+        )
+    return await asyncio.to_thread(extract_content, file_bytes, filename, modality)
+
+
+# Uniform (bytes, filename) signature per modality so dispatch is a single
+# dict lookup instead of an if/elif chain on the ingest hot path.
+_EXTRACTORS = {
+    "pdf": lambda data, name: pdf_processor.extract_text(data),
+    "image": lambda data, name: image_processor.extract_text(data),
+    "audio": audio_processor.extract_text,
+    "calendar": lambda data, name: calendar_processor.extract_text(data),
+    "text": text_processor.extract_text,
+}
 
 
 def extract_content(file_bytes: bytes, filename: str, modality: str) -> str:
     """Route to the correct processor based on modality."""
-    if modality == "pdf":
-        return pdf_processor.extract_text(file_bytes)
-    elif modality == "image":
-        return image_processor.extract_text(file_bytes)
-    elif modality == "audio":
-        return audio_processor.extract_text(file_bytes, filename)
-    elif modality == "calendar":
-        return calendar_processor.extract_text(file_bytes)
-    else:
-        return text_processor.extract_text(file_bytes, filename)
+    return _EXTRACTORS.get(modality, text_processor.extract_text)(
+        file_bytes, filename
+    )
 
 
 async def ingest_file(
@@ -58,6 +204,8 @@ async def ingest_file(
     file_content_base64: str,
     filename: str,
     user_id: str = "default",
+    *,
+    file_bytes: bytes | None = None,
 ) -> IngestResult:
     """
     Core ingestion pipeline — the heart of MindVault.
@@ -71,19 +219,92 @@ async def ingest_file(
     6. Store description embedding in ChromaDB
     7. If events found, store them in SQLite
     8. Return result
+
+    Implemented as prepare (1-5) + flush (6-7) so batch ingestion can share
+    one ChromaDB write across many files.
+    """
+    result, record = await _prepare_ingest(
+        file_path, file_content_base64, filename, user_id, file_bytes=file_bytes
+    )
+    if result is not None:
+        return result
+    return (await _flush_batch([record]))[0]
+
+
+async def ingest_batch(files: list[dict]) -> list[IngestResult]:
+    """
+    Ingest several files, batching the terminal ChromaDB write.
+    Each entry needs file_path, file_content_base64, filename, user_id.
+    """
+    async def _prepare_bounded(f: dict):
+        async with _ingest_semaphore:
+            return await _prepare_ingest(
+                f["file_path"],
+                f["file_content_base64"],
+                f["filename"],
+                f.get("user_id", "default"),
+            )
+
+    prepared = await asyncio.gather(*[_prepare_bounded(f) for f in files])
+
+    records = [record for _, record in prepared if record is not None]
+    flushed = iter(await _flush_batch(records))
+
+    return [
+        result if result is not None else next(flushed)
+        for result, _ in prepared
+    ]
+
+
+async def _prepare_ingest(
+    file_path: str,
+    file_content_base64: str,
+    filename: str,
+    user_id: str = "default",
+    *,
+    file_bytes: bytes | None = None,
+) -> tuple[IngestResult | None, dict | None]:
+    """
+    Decode, dedupe-check, extract and analyze one file.
+    Callers that already hold raw bytes (multipart uploads) pass file_bytes
+    and skip the base64 decode entirely.
+    Returns (final_result, None) when the pipeline short-circuits (cache hit
+    or failure), or (None, record) with an in-memory record awaiting flush.
     """
     try:
-        # 1. Decode file content
-        file_bytes = base64.b64decode(file_content_base64)
+        # 1. Decode file content (off-thread for large payloads — the decode
+        # is a single C pass but still blocks the loop on multi-MB files)
+        if file_bytes is None:
+            if len(file_content_base64) > 1 << 20:
+                file_bytes = await asyncio.to_thread(
+                    base64.b64decode, file_content_base64
+                )
+            else:
+                file_bytes = base64.b64decode(file_content_base64)
         content_hash = hashlib.sha256(file_bytes).hexdigest()[:16]
 
         # 2. Detect modality
         modality = detect_modality(filename)
         logger.info(f"Ingesting {filename} as {modality}")
 
-        # User-scoped latest-at-path identity
-        doc_id = hashlib.sha256(f"{user_id}:{file_path}".encode()).hexdigest()[:16]
+        # User-scoped latest-at-path identity. blake2b with an 8-byte digest
+        # gives the same 16-hex-char ID much cheaper than sha256 — this is an
+        # identifier, not an integrity check, so the short digest is fine.
+        doc_id = hashlib.blake2b(
+            f"{user_id}:{file_path}".encode(), digest_size=8
+        ).hexdigest()
         existing = vector_store.get_document(doc_id, user_id=user_id)
+        if not existing:
+            # Documents stored before the blake2b switch live under the old
+            # truncated-sha256 id; adopt that id so re-ingest updates them in
+            # place instead of duplicating the file under a new one.
+            legacy_id = hashlib.sha256(
+                f"{user_id}:{file_path}".encode()
+            ).hexdigest()[:16]
+            legacy = vector_store.get_document(legacy_id, user_id=user_id)
+            if legacy:
+                doc_id = legacy_id
+                existing = legacy
         if existing and existing.get("content_hash") == content_hash:
             return IngestResult(
                 success=True,
@@ -91,19 +312,50 @@ async def ingest_file(
                 description=existing.get("description", f"File: {filename}"),
                 category=existing.get("category", "other"),
                 has_events=bool(existing.get("has_events", False)),
+            ), None
+
+        # Same bytes already ingested for this user (e.g. mobile re-sync under
+        # a new path): reuse the stored analysis instead of re-running the
+        # LLM + embedding pipeline.
+        cached = await _lookup_ingested_hash(content_hash, user_id)
+        if cached and vector_store.get_document(cached["doc_id"], user_id=user_id):
+            vector_store.update_metadata(
+                cached["doc_id"],
+                {"file_path": file_path, "file_name": filename},
+                user_id=user_id,
             )
+            return IngestResult(
+                success=True,
+                file_path=file_path,
+                description=cached["description"],
+                category=cached["category"],
+                has_events=cached["has_events"],
+            ), None
 
         # 3. Extract text content
-        content = extract_content(file_bytes, filename, modality)
-        if not content.strip():
+        content = await _extract_content_async(file_bytes, filename, modality)
+        if not _NON_WS(content):
             return IngestResult(
                 success=False,
                 file_path=file_path,
                 error="Could not extract any content from file",
-            )
+            ), None
 
-        # 4. Generate description, category, summary via LLM
-        desc_result = await llm_service.generate_description(filename, content)
+        # 4 + 5. Description/category/summary and event extraction are
+        # independent prompts over the same content — run them concurrently
+        # so each file pays one Ollama round-trip instead of two. The event
+        # call is skipped entirely when the content has no date-like tokens.
+        # Cap what we hand to the LLM up front: model latency scales with
+        # input tokens, and a 200-page PDF adds nothing past the first pages.
+        desc_input = content[:4000]
+        event_input = content[:8000]
+        if DATE_RE.search(event_input):
+            desc_result, event_result = await llm_service.analyze_file(
+                filename, desc_input, event_input
+            )
+        else:
+            desc_result = await llm_service.generate_description(filename, desc_input)
+            event_result = {"has_events": False, "events": []}
         description = desc_result.get("description", f"File: {filename}")
         category = desc_result.get("category", "other")
         summary = desc_result.get("summary", filename)
@@ -112,16 +364,11 @@ async def ingest_file(
         valid_categories = {"work", "study", "personal", "medical", "finance", "other"}
         if category not in valid_categories:
             category = "other"
-
-        # 5. Check for events/dates
-        event_result = await llm_service.extract_events(content)
         has_events = event_result.get("has_events", False)
         events = event_result.get("events", [])
 
-        # 6. Store in ChromaDB — only file_path and description for lightweight search
-        now = datetime.utcnow().isoformat()
-
         # Minimal metadata: just enough to find and display the file path
+        now = _now_iso()
         metadata = {
             "file_path": file_path,
             "file_name": filename,
@@ -134,26 +381,19 @@ async def ingest_file(
             "user_id": user_id,
             "doc_id": doc_id,
         }
-        vector_store.store_document(doc_id, description, metadata)
-
-        # 7. Refresh events for this source file then store newly extracted ones
-        await notif_service.delete_events_by_source(file_path, user_id=user_id)
-        if has_events and events:
-            await notif_service.store_events(
-                events,
-                filename,
-                file_path,
-                user_id=user_id,
-            )
 
-        # 8. Return result
-        return IngestResult(
-            success=True,
-            file_path=file_path,
-            description=description,
-            category=category,
-            has_events=has_events,
-        )
+        return None, {
+            "doc_id": doc_id,
+            "file_path": file_path,
+            "filename": filename,
+            "description": description,
+            "category": category,
+            "metadata": metadata,
+            "has_events": has_events,
+            "events": events,
+            "content_hash": content_hash,
+            "user_id": user_id,
+        }
 
     except Exception as e:
         logger.error(f"Ingestion failed for {filename}: {e}", exc_info=True)
@@ -161,4 +401,75 @@ async def ingest_file(
             success=False,
             file_path=file_path,
             error=str(e),
+        ), None
+
+
+async def _flush_batch(records: list[dict]) -> list[IngestResult]:
+    """
+    Persist prepared records: one batched ChromaDB upsert (steps 6-8),
+    then per-file event bookkeeping.
+    """
+    if not records:
+        return []
+
+    # 6. Store in ChromaDB — only file_path and description for lightweight search
+    # A batch may name the same (user, path) twice; Chroma rejects duplicate
+    # IDs in one upsert, so collapse to the last record per doc_id — the same
+    # last-write-wins outcome the serialized per-file upserts produced.
+    unique_records = list({r["doc_id"]: r for r in records}.values())
+    try:
+        vector_store.store_document_batch(
+            [r["doc_id"] for r in unique_records],
+            [r["description"] for r in unique_records],
+            [r["metadata"] for r in unique_records],
         )
+    except Exception as e:
+        logger.error(f"Batched ChromaDB store failed: {e}", exc_info=True)
+        return [
+            IngestResult(success=False, file_path=r["file_path"], error=str(e))
+            for r in records
+        ]
+
+    results = []
+    for r in records:
+        try:
+            # 7. Refresh events for this source file then store newly extracted ones
+            await notif_service.delete_events_by_source(
+                r["file_path"], user_id=r["user_id"]
+            )
+            if r["has_events"] and r["events"]:
+                await notif_service.store_events(
+                    r["events"],
+                    r["filename"],
+                    r["file_path"],
+                    user_id=r["user_id"],
+                )
+
+            # Record the hash so re-uploads of identical bytes short-circuit.
+            await _record_ingested_hash(
+                r["content_hash"],
+                r["doc_id"],
+                r["description"],
+                r["category"],
+                r["has_events"],
+                r["user_id"],
+            )
+
+            # 8. Return result
+            results.append(
+                IngestResult(
+                    success=True,
+                    file_path=r["file_path"],
+                    description=r["description"],
+                    category=r["category"],
+                    has_events=r["has_events"],
+                )
+            )
+        except Exception as e:
+            logger.error(
+                f"Ingestion flush failed for {r['filename']}: {e}", exc_info=True
+            )
+            results.append(
+                IngestResult(success=False, file_path=r["file_path"], error=str(e))
+            )
+    return results
@@ -2,10 +2,16 @@
 """
 Clear all data from ChromaDB to fix SQLITE_FULL error.
 Run this after deploying the fix to start with a clean database.
+
+The directory is renamed out of the way first so the backend can recreate a
+fresh database immediately; the old data is deleted in the background
+(rmtree over a large Chroma dir on NFS can take minutes).
 """
 
 import os
 import shutil
+import subprocess
+import time
 
 # Path used in production (docker-compose volume)
 CHROMA_PATH = "/home/moatez/hack/mindvault/chroma_db"
@@ -17,8 +23,25 @@ if not os.path.exists(CHROMA_PATH):
 print(f"ChromaDB path: {CHROMA_PATH}")
 
 if os.path.exists(CHROMA_PATH):
-    print(f"Deleting {CHROMA_PATH}...")
-    shutil.rmtree(CHROMA_PATH)
+    trash_path = f"{CHROMA_PATH.rstrip('/')}.trash-{int(time.time())}"
+    print(f"Moving {CHROMA_PATH} -> {trash_path}...")
+    try:
+        os.rename(CHROMA_PATH, trash_path)
+    except OSError:
+        # Rename can fail across filesystems — fall back to the slow path
+        print("Rename failed, deleting in place (this may take a while)...")
+        shutil.rmtree(CHROMA_PATH)
+    else:
+        try:
+            subprocess.Popen(
+                ["rm", "-rf", trash_path],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            print(f"Background deletion of {trash_path} started.")
+        except OSError:
+            # No rm available (e.g. Windows) — delete synchronously
+            shutil.rmtree(trash_path)
     print("✓ ChromaDB cleared successfully!")
     print("\nRestart the backend to create a fresh database.")
 else:
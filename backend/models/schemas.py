@@ -1,6 +1,6 @@
 from typing import Optional
 
-from pydantic import BaseModel, Field, HttpUrl, field_validator
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, field_validator
 
 # --- Request schemas ---
 
@@ -45,21 +45,33 @@ class QueryRequest(BaseModel):
 
 # --- Response schemas ---
 
+# Shared config for server-assembled output models: instances are built from
+# our own storage and returned immediately, so freezing them lets pydantic
+# skip __setattr__ bookkeeping and documents that handlers never mutate them.
+_RESPONSE_CONFIG = ConfigDict(frozen=True)
+
 
 class ScannedFile(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     file_path: str
     file_name: str
     extension: str
     size_bytes: int
     modified_date: str
+    modality: str = ""  # pdf/text/image/audio/calendar, derived from extension
 
 
 class ScanResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     files: list[ScannedFile]
     total: int
 
 
 class IngestResult(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     success: bool
     file_path: str
     description: str = ""
@@ -69,12 +81,16 @@ class IngestResult(BaseModel):
 
 
 class BatchIngestResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     results: list[IngestResult]
     total: int
     successful: int
 
 
 class SourceFile(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     file_name: str
     file_path: str
     description: str
@@ -86,12 +102,16 @@ class SourceFile(BaseModel):
 
 
 class QueryResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     answer: str
     sources: list[SourceFile]
     verified: bool
 
 
 class MemoryItem(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     file_path: str
     file_name: str
     modality: str
@@ -106,11 +126,15 @@ class MemoryItem(BaseModel):
 
 
 class MemoriesResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     memories: list[MemoryItem]
     total: int
 
 
 class NotificationEvent(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     id: int
     title: str
     date: Optional[str]
@@ -121,32 +145,44 @@ class NotificationEvent(BaseModel):
 
 
 class NotificationsResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     events: list[NotificationEvent]
     total: int
 
 
 class ServiceStatus(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     name: str
     status: str  # "ok" | "error"
     detail: str = ""
 
 
 class HealthResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     status: str  # "healthy" | "degraded" | "unhealthy"
     services: list[ServiceStatus]
 
 
 class DeleteResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     success: bool
     message: str = ""
 
 
 class EventDeleteResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     success: bool
     deleted_count: int = 0
 
 
 class GraphNode(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     id: str
     type: str
     label: str
@@ -154,6 +190,8 @@ class GraphNode(BaseModel):
 
 
 class GraphEdge(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     source: str
     target: str
     relationship: str
@@ -161,6 +199,8 @@ class GraphEdge(BaseModel):
 
 
 class GraphResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     nodes: list[GraphNode]
     edges: list[GraphEdge]
     node_count: int
@@ -168,6 +208,8 @@ class GraphResponse(BaseModel):
 
 
 class GraphStatsResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     total_nodes: int
     total_edges: int
     file_nodes: int
@@ -175,6 +217,8 @@ class GraphStatsResponse(BaseModel):
 
 
 class RelatedFilesResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     doc_id: str
     related: list[MemoryItem]
     total: int
@@ -198,6 +242,8 @@ class WebhookCreate(BaseModel):
 
 
 class WebhookResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     id: int
     url: str
     label: str
@@ -206,6 +252,8 @@ class WebhookResponse(BaseModel):
 
 
 class WebhooksListResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
     webhooks: list[WebhookResponse]
     total: int
 
@@ -2,21 +2,39 @@ import logging
 import os
 import tempfile
 
+import torch
 import whisper
 
+try:
+    # CTranslate2 backend: int8 weights, ~4x faster CPU transcription than
+    # PyTorch whisper at the same WER for the tiny model. Optional.
+    from faster_whisper import WhisperModel as FasterWhisperModel
+except ImportError:
+    FasterWhisperModel = None
+
+from utils.bytes_cache import cached_by_content
+
 logger = logging.getLogger(__name__)
 
 # Lazy-loaded whisper model — tiny for speed
 _model = None
 
+# Whisper needs a file path (it shells out to ffmpeg), but the round-trip can
+# stay in RAM: prefer a tmpfs so a 50MB recording never touches disk.
+_TMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
 
 def _get_model():
     global _model
     if _model is None:
-        _model = whisper.load_model("tiny")
+        if FasterWhisperModel is not None:
+            _model = FasterWhisperModel("tiny", device="cpu", compute_type="int8")
+        else:
+            _model = whisper.load_model("tiny")
     return _model
 
 
+@cached_by_content()
 def extract_text(file_bytes: bytes, filename: str = "audio.mp3") -> str:
     """
     Transcribe audio to text using Whisper (tiny model).
@@ -24,12 +42,19 @@ def extract_text(file_bytes: bytes, filename: str = "audio.mp3") -> str:
     """
     ext = os.path.splitext(filename)[1] or ".mp3"
     try:
-        with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as tmp:
+        with tempfile.NamedTemporaryFile(
+            suffix=ext, dir=_TMP_DIR, delete=False
+        ) as tmp:
             tmp.write(file_bytes)
             tmp_path = tmp.name
 
         model = _get_model()
-        result = model.transcribe(tmp_path)
+        if FasterWhisperModel is not None and isinstance(model, FasterWhisperModel):
+            segments, _ = model.transcribe(tmp_path)
+            return " ".join(s.text.strip() for s in segments)
+        # fp16 halves activation bandwidth on GPU; on CPU whisper would
+        # fall back with a warning per call, so be explicit.
+        result = model.transcribe(tmp_path, fp16=torch.cuda.is_available())
         return result.get("text", "")
     except Exception as e:
         logger.error(f"Audio transcription failed: {e}")
@@ -13,31 +13,32 @@ def extract_text(file_bytes: bytes) -> str:
     try:
         cal = Calendar.from_ical(file_bytes)
         events = []
-        for component in cal.walk():
-            if component.name == "VEVENT":
-                parts = []
-                summary = component.get("summary")
-                if summary:
-                    parts.append(f"Event: {summary}")
-
-                dtstart = component.get("dtstart")
-                if dtstart:
-                    parts.append(f"Start: {dtstart.dt.isoformat()}")
-
-                dtend = component.get("dtend")
-                if dtend:
-                    parts.append(f"End: {dtend.dt.isoformat()}")
-
-                location = component.get("location")
-                if location:
-                    parts.append(f"Location: {location}")
-
-                description = component.get("description")
-                if description:
-                    parts.append(f"Description: {description}")
-
-                if parts:
-                    events.append("\n".join(parts))
+        # walk("VEVENT") filters inside icalendar instead of branching on
+        # component.name per component (VTIMEZONE, VALARM, ...)
+        for component in cal.walk("VEVENT"):
+            parts = []
+            summary = component.get("summary")
+            if summary:
+                parts.append(f"Event: {summary}")
+
+            dtstart = component.get("dtstart")
+            if dtstart:
+                parts.append(f"Start: {dtstart.dt.isoformat()}")
+
+            dtend = component.get("dtend")
+            if dtend:
+                parts.append(f"End: {dtend.dt.isoformat()}")
+
+            location = component.get("location")
+            if location:
+                parts.append(f"Location: {location}")
+
+            description = component.get("description")
+            if description:
+                parts.append(f"Description: {description}")
+
+            if parts:
+                events.append("\n".join(parts))
 
         return "\n\n---\n\n".join(events) if events else "Empty calendar file"
     except Exception as e:
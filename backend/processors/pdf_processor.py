@@ -1,10 +1,38 @@
 import io
 import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 
 import fitz  # PyMuPDF
 
 logger = logging.getLogger(__name__)
 
+# OCR is CPU-bound and trivially parallel per page, but the GIL (and
+# PyMuPDF's thread limitations) rule out threads — so scanned PDFs fan
+# their pages out to worker processes. Lazy like storage_agent's extract
+# pool, and only used from the main process: ingestion may already run
+# this module inside a pool worker, where a nested pool would just fork
+# more processes than cores.
+_ocr_pool: ProcessPoolExecutor | None = None
+
+
+def _get_ocr_pool() -> ProcessPoolExecutor:
+    global _ocr_pool
+    if _ocr_pool is None:
+        _ocr_pool = ProcessPoolExecutor(
+            max_workers=int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 2)))
+        )
+    return _ocr_pool
+
+
+def _ocr_page_bytes(png_bytes: bytes) -> str:
+    """OCR one pre-rendered page image (runs in a pool worker)."""
+    import pytesseract
+    from PIL import Image
+
+    return pytesseract.image_to_string(Image.open(io.BytesIO(png_bytes)))
+
 
 def extract_text(file_bytes: bytes) -> str:
     """
@@ -14,44 +42,55 @@ def extract_text(file_bytes: bytes) -> str:
     """
     try:
         doc = fitz.open(stream=file_bytes, filetype="pdf")
-        pages = []
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            text = page.get_text()
-            if text.strip():
-                pages.append(text.strip())
+        try:
+            # Decide OCR per page, not per document: a hybrid PDF keeps its
+            # typed text and only OCRs the scanned pages, and a fully
+            # scanned one skips the useless text pass re-run.
+            page_texts: list[str] = []
+            ocr_pages: list[int] = []
+            for page_num, page in enumerate(doc):
+                text = page.get_text().strip()
+                page_texts.append(text)
+                if len(text) < 20:
+                    ocr_pages.append(page_num)
 
-        result = "\n\n---\n\n".join(pages)
-
-        # OCR fallback for scanned PDFs
-        if len(result.strip()) < 50:
-            result = _ocr_fallback(doc)
-
-        doc.close()
-        return result
+            if ocr_pages:
+                for page_num, ocr_text in zip(
+                    ocr_pages, _ocr_pages(doc, ocr_pages)
+                ):
+                    page_texts[page_num] = ocr_text.strip()
+        finally:
+            # Always release the MuPDF context, even when a page throws —
+            # a leaked document pins its full store until process exit.
+            doc.close()
+        return "\n\n---\n\n".join(text for text in page_texts if text)
     except Exception as e:
         logger.error(f"PDF extraction failed: {e}")
         return ""
 
 
-def _ocr_fallback(doc) -> str:
-    """Use OCR on PDF pages when text extraction yields little content."""
+def _ocr_pages(doc, page_numbers: list[int]) -> list[str]:
+    """OCR the given pages, returning one text per requested page."""
     try:
-        import pytesseract
-        from PIL import Image
-
-        pages = []
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            pix = page.get_pixmap(dpi=200)
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            text = pytesseract.image_to_string(img)
-            if text.strip():
-                pages.append(text.strip())
-        return "\n\n---\n\n".join(pages)
+        import pytesseract  # noqa: F401 — fail fast if OCR is unavailable
+
+        # Render in the main process (PyMuPDF objects don't pickle), then
+        # OCR the encoded pages in parallel.
+        pngs = []
+        for page_num in page_numbers:
+            pix = doc[page_num].get_pixmap(dpi=200)
+            pngs.append(pix.tobytes("png"))
+            # Drop the raw bitmap right away and shrink MuPDF's internal
+            # store: peak memory stays at one page's pixmap (a few MB at
+            # 200 dpi) instead of accumulating every rendered page.
+            pix = None
+            fitz.TOOLS.store_shrink(100)
+
+        if len(pngs) > 1 and multiprocessing.parent_process() is None:
+            return list(_get_ocr_pool().map(_ocr_page_bytes, pngs))
+        return [_ocr_page_bytes(png) for png in pngs]
     except ImportError:
         logger.warning("pytesseract not installed, OCR unavailable")
-        return ""
     except Exception as e:
         logger.warning(f"OCR fallback failed: {e}")
-        return ""
+    return [""] * len(page_numbers)
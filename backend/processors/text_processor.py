@@ -1,12 +1,18 @@
 import io
 import logging
+import zipfile
 from email import policy
 from email.parser import BytesParser
+from html.parser import HTMLParser
+from xml.etree.ElementTree import iterparse
 
 from docx import Document
 
 logger = logging.getLogger(__name__)
 
+# Paragraph tag inside word/document.xml (WordprocessingML namespace)
+_DOCX_P_TAG = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}p"
+
 
 def extract_text(file_bytes: bytes, filename: str = "") -> str:
     """
@@ -34,6 +40,31 @@ def _extract_plain(file_bytes: bytes) -> str:
 
 
 def _extract_docx(file_bytes: bytes) -> str:
+    """
+    Extract text from a .docx by streaming word/document.xml directly.
+
+    python-docx materializes the full DOM plus a Python object per
+    paragraph; iterparse walks the XML once and clears each paragraph
+    element as soon as its text is collected, so multi-MB documents parse
+    in linear time with flat memory.
+    """
+    try:
+        paragraphs = []
+        with zipfile.ZipFile(io.BytesIO(file_bytes)) as zf:
+            with zf.open("word/document.xml") as f:
+                for _, element in iterparse(f):
+                    if element.tag == _DOCX_P_TAG:
+                        text = "".join(element.itertext())
+                        if text.strip():
+                            paragraphs.append(text)
+                        element.clear()
+        return "\n\n".join(paragraphs)
+    except Exception:
+        logger.warning("Streaming DOCX parse failed, falling back to python-docx")
+        return _extract_docx_fallback(file_bytes)
+
+
+def _extract_docx_fallback(file_bytes: bytes) -> str:
     """Extract text from a .docx file using python-docx."""
     try:
         doc = Document(io.BytesIO(file_bytes))
@@ -44,6 +75,46 @@ def _extract_docx(file_bytes: bytes) -> str:
         return ""
 
 
+class _HTMLTextExtractor(HTMLParser):
+    """Minimal HTML-to-text: keeps text nodes, drops tags, skips script/style."""
+
+    _BLOCK_TAGS = {"br", "p", "div", "li", "tr", "h1", "h2", "h3", "h4"}
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip_depth += 1
+        elif tag in self._BLOCK_TAGS:
+            self._chunks.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style") and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._chunks.append(data)
+
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+
+def _html_to_text(html: str) -> str:
+    """Strip markup from an HTML email body so the LLM doesn't eat tags."""
+    extractor = _HTMLTextExtractor()
+    try:
+        extractor.feed(html)
+        extractor.close()
+    except Exception:
+        return html
+    lines = (line.strip() for line in extractor.text().splitlines())
+    return "\n".join(line for line in lines if line)
+
+
 def _extract_email(file_bytes: bytes) -> str:
     """Extract text content from an .eml email file."""
     try:
@@ -58,10 +129,23 @@ def _extract_email(file_bytes: bytes) -> str:
             parts.append(f"Date: {msg['date']}")
         parts.append("")  # blank line
 
-        body = msg.get_body(preferencelist=("plain", "html"))
-        if body:
-            content = body.get_content()
-            parts.append(content)
+        # Walk parts once: first text/plain part wins; otherwise fall back
+        # to a de-tagged text/html part, so HTML-only mail doesn't fill the
+        # index (and the LLM's context window) with markup. Attachments are
+        # skipped — a text/plain attachment preceding the body part must not
+        # be mistaken for the body.
+        body_text = ""
+        for part in msg.walk():
+            if part.get_content_disposition() == "attachment":
+                continue
+            content_type = part.get_content_type()
+            if content_type == "text/plain":
+                body_text = part.get_content()
+                break
+            if content_type == "text/html" and not body_text:
+                body_text = _html_to_text(part.get_content())
+        if body_text:
+            parts.append(body_text)
         return "\n".join(parts)
     except Exception as e:
         logger.error(f"Email extraction failed: {e}")
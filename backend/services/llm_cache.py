@@ -0,0 +1,69 @@
+import hashlib
+import logging
+import os
+import time
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+# Persistent cache path — survives restarts, like the events DB
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./llm_cache.db")
+CACHE_ENABLED = os.getenv("LLM_CACHE", "1") == "1"
+
+DEFAULT_TTL = 7 * 24 * 3600  # 7 days
+
+INIT_SQL = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    hash TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def cache_key(model: str, prompt_version: str, temperature: float, prompt: str) -> str:
+    """Content-addressable key: any change to model, prompts, or sampling
+    parameters produces a different hash, so stale entries are never served."""
+    material = f"{model}|{prompt_version}|{temperature}|{prompt}"
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+async def lookup(key: str) -> str | None:
+    """Return the cached response for an exact key, or None on miss/expiry."""
+    if not CACHE_ENABLED:
+        return None
+    try:
+        async with aiosqlite.connect(CACHE_PATH) as db:
+            await db.execute(INIT_SQL)
+            cursor = await db.execute(
+                "SELECT response FROM llm_cache WHERE hash = ? AND expires_at > ?",
+                (key, time.time()),
+            )
+            row = await cursor.fetchone()
+            return row[0] if row else None
+    except Exception:
+        logger.debug("LLM cache lookup failed, calling through")
+        return None
+
+
+async def store(key: str, response: str, ttl: float = DEFAULT_TTL) -> None:
+    """Insert a response under its key; expired rows are pruned lazily."""
+    if not CACHE_ENABLED:
+        return
+    now = time.time()
+    try:
+        async with aiosqlite.connect(CACHE_PATH) as db:
+            await db.execute(INIT_SQL)
+            await db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            await db.execute(
+                """
+                INSERT OR REPLACE INTO llm_cache (hash, response, created_at, expires_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, response, now, now + ttl),
+            )
+            await db.commit()
+    except Exception:
+        logger.debug("LLM cache store failed, ignoring")
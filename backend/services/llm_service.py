@@ -1,37 +1,248 @@
-import json
+import asyncio
 import logging
 import os
 
 import httpx
+import orjson
+from services import llm_cache
+from services.semantic_cache import semantic_cached
 
 logger = logging.getLogger(__name__)
 
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
 MODEL_NAME = "qwen2.5:3b"  # Under 4B params — hackathon constraint
+# Part of the exact-cache key: bump whenever a prompt in this file changes so
+# stale cached responses invalidate themselves.
+PROMPT_VERSION = "v2"
+
+# Prompt truncation is a token budget, not a char count: char slicing
+# overflows the context on token-dense text (CJK, code) and underfills it on
+# plain English. tiktoken's cl100k encoding is a close enough proxy for the
+# qwen tokenizer; when it is unavailable we approximate 4 chars per token.
+_CHARS_PER_TOKEN = 4
+_token_encoder = None
+_token_encoder_tried = False
+
+
+def _get_token_encoder():
+    global _token_encoder, _token_encoder_tried
+    if not _token_encoder_tried:
+        _token_encoder_tried = True
+        try:
+            import tiktoken
+
+            _token_encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _token_encoder = None
+    return _token_encoder
+
+
+def _truncate_tokens(text: str, max_tokens: int) -> str:
+    """Trim text to at most max_tokens (approximate when tiktoken is absent)."""
+    encoder = _get_token_encoder()
+    if encoder is None:
+        return text[: max_tokens * _CHARS_PER_TOKEN]
+    tokens = encoder.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoder.decode(tokens[:max_tokens])
+
+
+# Cap concurrent Ollama requests so batch ingestion doesn't flood the local
+# model server; callers can still fire calls in parallel and queue here.
+_ollama_semaphore = asyncio.Semaphore(int(os.getenv("OLLAMA_CONCURRENCY", "4")))
+
+# Shared client so every generate call reuses a kept-alive connection to
+# Ollama instead of paying a TCP handshake per request. Created lazily,
+# closed from the app's lifespan shutdown.
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            base_url=OLLAMA_URL,
+            timeout=httpx.Timeout(120.0, connect=10.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=40,
+                max_connections=100,
+                keepalive_expiry=30.0,
+            ),
+        )
+    return _http_client
+
 
+async def close_http_client() -> None:
+    """Close the shared Ollama client (called on app shutdown)."""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
 
-async def generate(prompt: str, temperature: float = 0.3) -> str:
+
+async def generate(
+    prompt: str, temperature: float = 0.3, format: dict | None = None
+) -> str:
     """
     Call Ollama's /api/generate endpoint with Qwen2.5-3B.
-    Uses low temperature for factual/structured outputs.
+    Uses low temperature for factual/structured outputs. Passing a JSON
+    schema as `format` makes Ollama constrain decoding to it, so structured
+    callers get parseable output on the first try.
     """
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        response = await client.post(
-            f"{OLLAMA_URL}/api/generate",
+    body = {
+        "model": MODEL_NAME,
+        "prompt": prompt,
+        "stream": False,
+        "options": {
+            "temperature": temperature,
+            "num_predict": 1024,
+        },
+    }
+    if format is not None:
+        body["format"] = format
+    async with _ollama_semaphore:
+        client = get_http_client()
+        response = await client.post("/api/generate", json=body)
+        response.raise_for_status()
+        return response.json()["response"]
+
+
+async def generate_stream(prompt: str, temperature: float = 0.3):
+    """
+    Streaming variant of generate(): yields response chunks as Ollama
+    produces them, so callers can forward tokens after time-to-first-token
+    instead of waiting out the full generation.
+    """
+    async with _ollama_semaphore:
+        client = get_http_client()
+        async with client.stream(
+            "POST",
+            "/api/generate",
             json={
                 "model": MODEL_NAME,
                 "prompt": prompt,
-                "stream": False,
+                "stream": True,
                 "options": {
                     "temperature": temperature,
                     "num_predict": 1024,
                 },
             },
-        )
-        response.raise_for_status()
-        return response.json()["response"]
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = orjson.loads(line)
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    break
+
+
+async def cached_generate(
+    prompt: str, temperature: float = 0.3, format: dict | None = None
+) -> str:
+    """
+    generate() behind a persistent exact-match cache.
+
+    Keyed by SHA-256 of model + PROMPT_VERSION + temperature + prompt, so
+    re-ingesting an unchanged file or re-asking a verbatim question skips the
+    seconds-scale model forward pass entirely. The cache fails open.
+    """
+    key = llm_cache.cache_key(MODEL_NAME, PROMPT_VERSION, temperature, prompt)
+    cached = await llm_cache.lookup(key)
+    if cached is not None:
+        return cached
+
+    response = await generate(prompt, temperature=temperature, format=format)
+    await llm_cache.store(key, response)
+    return response
+
+
+# JSON schemas handed to Ollama's `format` parameter: constrained decoding
+# can only emit output matching the schema, which all but eliminates the
+# malformed-JSON fallback path in _parse_json.
+_DESCRIPTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "description": {"type": "string"},
+        "category": {
+            "enum": ["work", "study", "personal", "medical", "finance", "other"]
+        },
+        "summary": {"type": "string"},
+    },
+    "required": ["description", "category", "summary"],
+}
+
+_EVENTS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "has_events": {"type": "boolean"},
+        "events": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "date": {"type": ["string", "null"]},
+                    "description": {"type": "string"},
+                },
+                "required": ["title", "date", "description"],
+            },
+        },
+    },
+    "required": ["has_events", "events"],
+}
 
 
+async def _generate_json_with_retry(
+    prompt: str,
+    format: dict,
+    fallback: dict,
+    max_attempts: int = 3,
+) -> dict:
+    """
+    Generate with repair-on-failure: when output doesn't parse as JSON,
+    re-prompt at temperature 0 with the bad output quoted back, backing off
+    between attempts. Losing an entire file analysis to one truncated
+    response is far more expensive than the occasional extra call.
+    """
+    # The cache is managed here rather than via cached_generate so that only
+    # responses that actually parse get stored: caching before validation
+    # would replay one malformed reply for the cache's whole lifetime.
+    key = llm_cache.cache_key(MODEL_NAME, PROMPT_VERSION, 0.3, prompt)
+    cached = await llm_cache.lookup(key)
+    if cached is not None:
+        parsed = _try_parse(cached)
+        if parsed is not None:
+            return parsed
+        # A bad entry from an older run; regenerate and overwrite it below.
+
+    raw = await generate(prompt, temperature=0.3, format=format)
+    parsed = _try_parse(raw)
+    for attempt in range(1, max_attempts):
+        if parsed is not None:
+            break
+        await asyncio.sleep(1.0 * attempt)
+        repair_prompt = (
+            f"{prompt}\n\n"
+            f"Your previous output was not valid JSON:\n{raw[:300]}\n"
+            "Output ONLY valid JSON matching the requested fields."
+        )
+        raw = await generate(repair_prompt, temperature=0.0, format=format)
+        parsed = _try_parse(raw)
+    if parsed is not None:
+        await llm_cache.store(key, raw)
+        return parsed
+    logger.warning(f"LLM JSON unparseable after {max_attempts} attempts: {raw[:200]}")
+    return fallback
+
+
+@semantic_cached(
+    key=lambda filename, content: f"{filename}\n{content[:1500]}",
+    namespace="ingest",
+)
 async def generate_description(filename: str, content: str) -> dict:
     """
     Ask the LLM to produce a structured description, category, and summary.
@@ -39,7 +250,7 @@ async def generate_description(filename: str, content: str) -> dict:
     """
     prompt = f"""You are analyzing a file to create a searchable description.
 File name: {filename}
-Content: {content[:2000]}
+Content: {_truncate_tokens(content, 500)}
 
 Generate a JSON response with these fields:
 - description: 2-3 sentences describing the main topic and content of this file
@@ -48,9 +259,9 @@ Generate a JSON response with these fields:
 
 Respond ONLY with valid JSON, no markdown, no explanation."""
 
-    raw = await generate(prompt)
-    return _parse_json(
-        raw,
+    return await _generate_json_with_retry(
+        prompt,
+        format=_DESCRIPTION_SCHEMA,
         fallback={
             "description": f"File: {filename}",
             "category": "other",
@@ -59,13 +270,31 @@ Respond ONLY with valid JSON, no markdown, no explanation."""
     )
 
 
+async def analyze_file(
+    filename: str, desc_content: str, event_content: str
+) -> tuple[dict, dict]:
+    """
+    Run description and event extraction concurrently for one file.
+
+    The two prompts are independent analyses of the same content, so running
+    them together overlaps their model time instead of leaving Ollama idle
+    between serialized calls. Set OLLAMA_NUM_PARALLEL>=2 server-side so the
+    requests land on parallel slots rather than queuing.
+    """
+    desc_result, event_result = await asyncio.gather(
+        generate_description(filename, desc_content),
+        extract_events(event_content),
+    )
+    return desc_result, event_result
+
+
 async def extract_events(content: str) -> dict:
     """
     Ask the LLM to find dates/deadlines/appointments in the content.
     Returns dict with has_events (bool) and events (list).
     """
     prompt = f"""Analyze this content and extract any dates, deadlines, appointments, or reminders.
-Content: {content[:2000]}
+Content: {_truncate_tokens(content, 500)}
 
 Respond with JSON:
 - has_events: true or false
@@ -74,9 +303,9 @@ Respond with JSON:
 If no events found, return has_events: false and empty events array.
 Respond ONLY with valid JSON."""
 
-    raw = await generate(prompt)
-    return _parse_json(
-        raw,
+    return await _generate_json_with_retry(
+        prompt,
+        format=_EVENTS_SCHEMA,
         fallback={
             "has_events": False,
             "events": [],
@@ -84,17 +313,24 @@ Respond ONLY with valid JSON."""
     )
 
 
-async def answer_query(
-    question: str, context: str, conversation_history: list[dict] | None = None
+def _build_answer_prompt(
+    question: str, context: str, conversation_history: list[dict] | None
 ) -> str:
-    """Generate an answer grounded in the retrieved file context."""
+    """
+    Assemble the Q&A prompt shared by answer_query and answer_query_stream.
+
+    Ordered for KV-prefix reuse: static instructions first, then the file
+    context (stable across turns on the same topic), then the append-only
+    conversation history, and the fully dynamic question last — so repeated
+    chats only re-prefill the suffix that actually changed.
+    """
     conv_context = ""
     if conversation_history:
         recent = conversation_history[-3:]  # Last 3 turns
         parts = []
         for turn in recent:
             q = turn.get("question", "")
-            a = turn.get("answer", "")[:200]  # Truncate answers
+            a = _truncate_tokens(turn.get("answer", ""), 50)  # Truncate answers
             parts.append(f"User: {q}\nAssistant: {a}")
         conv_context = "\n\n".join(parts)
 
@@ -119,10 +355,29 @@ Always try to give a useful answer based on the files provided — do NOT say yo
 Question: {question}
 
 Answer:"""
+    return prompt
 
+
+@semantic_cached(
+    key=lambda question, context, conversation_history=None: f"{question}\n{context}",
+    namespace="query",
+)
+async def answer_query(
+    question: str, context: str, conversation_history: list[dict] | None = None
+) -> str:
+    """Generate an answer grounded in the retrieved file context."""
+    prompt = _build_answer_prompt(question, context, conversation_history)
     return await generate(prompt, temperature=0.3)
 
 
+def answer_query_stream(
+    question: str, context: str, conversation_history: list[dict] | None = None
+):
+    """Streaming answer_query: yields answer chunks as they are generated."""
+    prompt = _build_answer_prompt(question, context, conversation_history)
+    return generate_stream(prompt, temperature=0.3)
+
+
 async def verify_answer(question: str, context: str, answer: str) -> bool:
     """
     Self-verification step: ask the LLM if its own answer is grounded.
@@ -131,13 +386,13 @@ async def verify_answer(question: str, context: str, answer: str) -> bool:
     prompt = f"""Does the answer below use information from the provided files? Reply YES or NO only.
 
 Files:
-{context[:1500]}
+{_truncate_tokens(context, 400)}
 
 Answer: {answer}
 
 Reply YES or NO:"""
 
-    raw = await generate(prompt, temperature=0.1)
+    raw = await cached_generate(prompt, temperature=0.1)
     return raw.strip().upper().startswith("YES")
 
 
@@ -154,28 +409,43 @@ async def check_availability() -> bool:
         return False
 
 
-def _parse_json(raw: str, fallback: dict) -> dict:
+def _try_parse(raw: str) -> dict | None:
     """
-    Robustly parse JSON from LLM output.
+    Parse JSON from LLM output, or None when it is unsalvageable.
     LLMs sometimes wrap JSON in markdown code fences — strip those.
     """
     text = raw.strip()
-    # Strip markdown code fences if present
+    # Strip markdown code fences if present. Almost every fenced response is
+    # exactly one ```json ... ``` block, which two slices handle without
+    # rebuilding the string line by line; the per-line filter stays as the
+    # fallback for pathological multi-fence output.
     if text.startswith("```"):
-        lines = text.split("\n")
-        lines = [l for l in lines if not l.strip().startswith("```")]
-        text = "\n".join(lines)
+        if text.count("```") <= 2:
+            text = text.split("\n", 1)[-1]
+            if text.endswith("```"):
+                text = text.rsplit("\n", 1)[0]
+        else:
+            lines = [l for l in text.split("\n") if not l.strip().startswith("```")]
+            text = "\n".join(lines)
 
     try:
-        return json.loads(text)
-    except json.JSONDecodeError:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
         # Try to find JSON object in the text
         start = text.find("{")
         end = text.rfind("}") + 1
         if start != -1 and end > start:
             try:
-                return json.loads(text[start:end])
-            except json.JSONDecodeError:
+                return orjson.loads(text[start:end])
+            except orjson.JSONDecodeError:
                 pass
-        logger.warning(f"Failed to parse LLM JSON output: {text[:200]}")
+        return None
+
+
+def _parse_json(raw: str, fallback: dict) -> dict:
+    """Robustly parse JSON from LLM output, degrading to fallback."""
+    parsed = _try_parse(raw)
+    if parsed is None:
+        logger.warning(f"Failed to parse LLM JSON output: {raw[:200]}")
         return fallback
+    return parsed
@@ -1,9 +1,13 @@
+import asyncio
 import logging
 import os
+import re
 from datetime import date, datetime, timedelta
+from functools import lru_cache
 
 import aiosqlite
 import httpx
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +38,114 @@ CREATE TABLE IF NOT EXISTS webhooks (
 );
 """
 
+# Hot-path lookups all filter by user_id plus a second predicate: the
+# upcoming-event listing/badge count on date, the store_events dedup probe
+# and per-source deletes on source_path, and get_webhooks on is_active.
+# Composite indexes turn each one from a table scan into a B-tree search.
+INIT_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_events_user_date ON events(user_id, date)",
+    "CREATE INDEX IF NOT EXISTS idx_events_source ON events(source_path, user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_webhooks_user_active ON webhooks(user_id, is_active)",
+    # Partial index for the badge count: the dated half of get_event_count
+    # only touches rows with a date, so the index skips undated rows and
+    # stays small enough to live in the page cache.
+    "CREATE INDEX IF NOT EXISTS idx_events_future ON events(user_id, date) WHERE date IS NOT NULL",
+)
+
+# Backstop for the store_events dedup: with this in place INSERT OR IGNORE
+# can never double-store an event even if two ingests race the same file.
+# Created separately because legacy databases may already hold duplicates,
+# in which case creation fails and we keep relying on the SELECT-side dedup.
+UNIQUE_EVENT_INDEX_SQL = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_events_unique "
+    "ON events(user_id, title, date, source_path)"
+)
+
+UNIQUE_WEBHOOK_INDEX_SQL = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_webhooks_user ON webhooks(user_id)"
+)
+
+# Shared connection: opening the SQLite file per call re-reads the WAL header
+# and starts with a cold page cache every time, which dwarfs the cost of the
+# badge-count style queries this module serves. Reopened when DB_PATH changes
+# (tests point it at temp files).
+_db: aiosqlite.Connection | None = None
+_db_path: str | None = None
+
+# Serializes the explicit BEGIN IMMEDIATE blocks below. The shared connection
+# runs in autocommit mode, so without this two concurrent writers would nest
+# BEGINs ("cannot start a transaction within a transaction") and interleaved
+# statements from other coroutines would silently join an open transaction.
+_write_lock = asyncio.Lock()
+
+# Shared client for webhook delivery so consecutive fan-outs reuse the
+# keep-alive connections to Discord instead of paying TCP+TLS setup each
+# time store_events fires.
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared webhook HTTP client, creating it lazily."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(timeout=10.0)
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared webhook HTTP client (called on app shutdown)."""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+
+async def get_db() -> aiosqlite.Connection:
+    """Return the shared connection, opening (or reopening) it as needed."""
+    global _db, _db_path
+    if _db is None or _db_path != DB_PATH:
+        if _db is not None:
+            try:
+                await _db.close()
+            except Exception:
+                pass
+        # "file:" paths are SQLite URIs (e.g. shared-cache in-memory DBs used
+        # by the tests) and need uri=True to be parsed as such.
+        # isolation_level=None is autocommit mode: single-statement writes
+        # commit themselves, and the multi-statement write paths open explicit
+        # BEGIN IMMEDIATE transactions so the writer lock is taken up front
+        # instead of being upgraded mid-transaction (the deferred-lock dance
+        # behind SQLITE_BUSY under concurrency).
+        _db = await aiosqlite.connect(
+            DB_PATH,
+            uri=DB_PATH.startswith("file:"),
+            isolation_level=None,
+        )
+        _db_path = DB_PATH
+        _db.row_factory = aiosqlite.Row
+        # WAL lets readers proceed during writes and NORMAL skips the fsync
+        # per transaction that FULL pays — the standard cheap durability
+        # trade for an app-local event store.
+        await _db.execute("PRAGMA journal_mode=WAL")
+        await _db.execute("PRAGMA synchronous=NORMAL")
+        await _db.execute("PRAGMA temp_store=MEMORY")
+        await _db.execute("PRAGMA cache_size=-64000")
+    return _db
+
+
+async def close_db() -> None:
+    """Close the shared connection (called on app shutdown)."""
+    global _db, _db_path
+    if _db is not None:
+        try:
+            await _db.close()
+        except Exception:
+            pass
+    _db = None
+    _db_path = None
+    # The webhook-presence cache describes the database we just closed.
+    _has_webhooks_cache.clear()
+
 
 async def _ensure_column(db: aiosqlite.Connection, table: str, column: str, ddl: str) -> None:
     cursor = await db.execute(f"PRAGMA table_info({table})")
@@ -45,19 +157,49 @@ async def _ensure_column(db: aiosqlite.Connection, table: str, column: str, ddl:
 
 async def init_db() -> None:
     """Create tables and run lightweight migrations when needed."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(INIT_SQL)
-        await db.execute(INIT_WEBHOOKS_SQL)
+    db = await get_db()
+    await db.execute(INIT_SQL)
+    await db.execute(INIT_WEBHOOKS_SQL)
 
-        await _ensure_column(db, "events", "user_id", "user_id TEXT NOT NULL DEFAULT 'default'")
-        await _ensure_column(db, "webhooks", "user_id", "user_id TEXT NOT NULL DEFAULT 'default'")
+    await _ensure_column(db, "events", "user_id", "user_id TEXT NOT NULL DEFAULT 'default'")
+    await _ensure_column(db, "webhooks", "user_id", "user_id TEXT NOT NULL DEFAULT 'default'")
 
-        await db.commit()
+    for index_sql in INIT_INDEX_SQL:
+        await db.execute(index_sql)
+
+    try:
+        await db.execute(UNIQUE_EVENT_INDEX_SQL)
+    except aiosqlite.IntegrityError:
+        logger.warning("Duplicate legacy events present; skipping unique index")
+
+    # One webhook per user is already the save_webhook contract; the unique
+    # index makes it enforceable so save_webhook can upsert in one statement.
+    try:
+        await db.execute(UNIQUE_WEBHOOK_INDEX_SQL)
+    except aiosqlite.IntegrityError:
+        logger.warning("Duplicate legacy webhooks present; skipping unique index")
+
+    await db.commit()
+
+
+# LLM-extracted dates are almost always plain ISO "YYYY-MM-DD[THH:MM]";
+# a precompiled match plus direct datetime() construction beats
+# fromisoformat's general parser, and the lru_cache makes re-parses of the
+# same date string (dedup re-ingests, badge refreshes) free.
+_ISO_DATETIME = re.compile(r"^(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2}):(\d{2}))?")
 
 
-def _parse_event_datetime(raw: str) -> datetime | None:
+@lru_cache(maxsize=1024)
+def _parse_event_datetime(raw: str | None) -> datetime | None:
     if not raw:
         return None
+    match = _ISO_DATETIME.match(raw)
+    if match:
+        year, month, day, hour, minute = match.groups()
+        try:
+            return datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0))
+        except ValueError:
+            return None
     try:
         return datetime.fromisoformat(raw.replace("Z", "+00:00")).replace(tzinfo=None)
     except ValueError:
@@ -77,59 +219,107 @@ async def store_events(
     if not events:
         return 0
 
-    async with aiosqlite.connect(DB_PATH) as db:
-        count = 0
-        inserted_events: list[dict] = []
-
-        for event in events:
-            title = event.get("title", "Untitled Event")
-            event_date = event.get("date")
-            description = event.get("description", "")
-
-            # Dedup per user + file path.
-            cursor = await db.execute(
-                """
-                SELECT COUNT(*)
-                FROM events
-                WHERE user_id = ? AND title = ? AND date IS ? AND source_path = ?
-                """,
-                (user_id, title, event_date, source_path),
-            )
-            row = await cursor.fetchone()
-            if row and row[0] > 0:
-                continue
-
-            await db.execute(
-                """
-                INSERT INTO events (user_id, title, date, description, source_file, source_path)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (user_id, title, event_date, description, source_file, source_path),
-            )
-            inserted_events.append(
-                {"title": title, "date": event_date, "description": description}
-            )
-            count += 1
-
-        await db.commit()
-
-        # Trigger webhooks only for newly inserted events within the next 24h.
-        try:
-            now = datetime.now()
-            tomorrow = now + timedelta(hours=24)
-            for event in inserted_events:
-                parsed = _parse_event_datetime(event.get("date"))
-                if parsed and now <= parsed <= tomorrow:
-                    await trigger_webhooks(
-                        title=event["title"],
-                        description=event["description"],
-                        date=event["date"],
-                        user_id=user_id,
-                    )
-        except Exception:
-            logger.exception("Failed to trigger webhooks after storing events")
+    db = await get_db()
+    # Dedup per user + file path: one SELECT for the whole batch instead
+    # of a COUNT(*) probe per event.
+    cursor = await db.execute(
+        "SELECT title, date FROM events WHERE user_id = ? AND source_path = ?",
+        (user_id, source_path),
+    )
+    existing = {(row[0], row[1]) for row in await cursor.fetchall()}
+
+    rows: list[tuple] = []
+    inserted_events: list[dict] = []
+    for event in events:
+        title = event.get("title", "Untitled Event")
+        event_date = event.get("date")
+        if (title, event_date) in existing:
+            continue
+        existing.add((title, event_date))
+
+        description = event.get("description", "")
+        rows.append(
+            (user_id, title, event_date, description, source_file, source_path)
+        )
+        inserted_events.append(
+            {"title": title, "date": event_date, "description": description}
+        )
 
-        return count
+    count = 0
+    if rows:
+        # OR IGNORE pairs with the unique index so a concurrent ingest of the
+        # same file can't double-store an event that slipped past the SELECT.
+        async with _write_lock:
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = await db.executemany(
+                    """
+                    INSERT OR IGNORE INTO events (user_id, title, date, description, source_file, source_path)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+                await db.execute("COMMIT")
+            except Exception:
+                await db.execute("ROLLBACK")
+                raise
+        count = cursor.rowcount
+
+    # Notify only for newly inserted events within the next 24h. Delivery is
+    # fire-and-forget: the ingest response shouldn't wait on Discord RTTs,
+    # the caller only needs to know the events are committed.
+    now = datetime.now()
+    tomorrow = now + timedelta(hours=24)
+    notifications = [
+        event
+        for event in inserted_events
+        if (parsed := _parse_event_datetime(event.get("date")))
+        and now <= parsed <= tomorrow
+    ]
+    if notifications:
+        task = asyncio.create_task(_deliver_batch(notifications, user_id))
+        _bg_tasks.add(task)
+        task.add_done_callback(_bg_tasks.discard)
+
+    return count
+
+
+# Strong refs keep in-flight delivery tasks from being garbage-collected
+# mid-send (the event loop only holds weak references to tasks).
+_bg_tasks: set[asyncio.Task] = set()
+
+
+async def _deliver_batch(notifications: list[dict], user_id: str) -> None:
+    """Deliver webhook reminders for a batch of newly stored events.
+
+    Fetches the user's webhooks once and sends every (webhook, event) pair
+    in a single gather, instead of re-querying SQLite and re-posting
+    serially per event.
+    """
+    try:
+        if not _has_webhooks_cache.get(user_id, True):
+            return
+        webhooks = await get_webhooks(user_id=user_id)
+        if not webhooks:
+            return
+        bodies = [
+            orjson.dumps(
+                _embed_payload(event["title"], event["description"], event["date"])
+            )
+            for event in notifications
+        ]
+        headers = {"content-type": "application/json"}
+        client = get_http_client()
+        await asyncio.gather(
+            *(
+                client.post(webhook["url"], content=body, headers=headers)
+                for webhook in webhooks
+                for body in bodies
+            ),
+            return_exceptions=True,
+        )
+    except Exception:
+        logger.exception("Failed to trigger webhooks after storing events")
 
 
 async def get_upcoming_events(user_id: str = DEFAULT_USER_ID) -> list[dict]:
@@ -138,52 +328,49 @@ async def get_upcoming_events(user_id: str = DEFAULT_USER_ID) -> list[dict]:
     Events without a parseable date are included (they might still be relevant).
     """
     today = date.today().isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute(
-            """
-            SELECT id, title, date, description, source_file, source_path, created_at
-            FROM events
-            WHERE user_id = ? AND (date IS NULL OR date >= ?)
-            ORDER BY
-                CASE WHEN date IS NULL THEN 1 ELSE 0 END,
-                date ASC
-            """,
-            (user_id, today),
-        )
-        rows = await cursor.fetchall()
-        return [
-            {
-                "id": row[0],
-                "title": row[1],
-                "date": row[2],
-                "description": row[3],
-                "source_file": row[4],
-                "source_path": row[5],
-                "created_at": row[6],
-            }
-            for row in rows
-        ]
+    db = await get_db()
+    cursor = await db.execute(
+        """
+        SELECT id, title, date, description, source_file, source_path, created_at
+        FROM events
+        WHERE user_id = ? AND (date IS NULL OR date >= ?)
+        ORDER BY
+            CASE WHEN date IS NULL THEN 1 ELSE 0 END,
+            date ASC
+        """,
+        (user_id, today),
+    )
+    rows = await cursor.fetchall()
+    # Row is a C-backed mapping; dict(row) copies the fields in one shot
+    # instead of seven per-index fetches, and stays correct if the SELECT
+    # column list changes.
+    return [dict(row) for row in rows]
 
 
 async def get_event_count(user_id: str = DEFAULT_USER_ID) -> int:
     """Count upcoming user-scoped events for badge display."""
     today = date.today().isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            "SELECT COUNT(*) FROM events WHERE user_id = ? AND (date IS NULL OR date >= ?)",
-            (user_id, today),
-        )
-        row = await cursor.fetchone()
-        return row[0] if row else 0
+    db = await get_db()
+    # Split the OR into two index-only counts: the NULL half hits
+    # idx_events_user_date and the range half hits the partial
+    # idx_events_future, instead of one scan evaluating the OR per row.
+    cursor = await db.execute(
+        """
+        SELECT (SELECT COUNT(*) FROM events WHERE user_id = ? AND date IS NULL)
+             + (SELECT COUNT(*) FROM events WHERE user_id = ? AND date >= ?)
+        """,
+        (user_id, user_id, today),
+    )
+    row = await cursor.fetchone()
+    return row[0] if row else 0
 
 
 async def check_connection() -> bool:
     """Health check — verify SQLite is accessible."""
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute("SELECT 1")
-            return True
+        db = await get_db()
+        await db.execute("SELECT 1")
+        return True
     except Exception:
         return False
 
@@ -191,12 +378,12 @@ async def check_connection() -> bool:
 async def delete_event(event_id: int, user_id: str = DEFAULT_USER_ID) -> bool:
     """Delete a single event by ID for one user."""
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            cursor = await db.execute(
-                "DELETE FROM events WHERE id = ? AND user_id = ?", (event_id, user_id)
-            )
-            await db.commit()
-            return cursor.rowcount > 0
+        db = await get_db()
+        cursor = await db.execute(
+            "DELETE FROM events WHERE id = ? AND user_id = ?", (event_id, user_id)
+        )
+        await db.commit()
+        return cursor.rowcount > 0
     except Exception:
         return False
 
@@ -207,13 +394,13 @@ async def delete_events_by_source(
 ) -> int:
     """Delete all events from a specific source file for one user."""
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            cursor = await db.execute(
-                "DELETE FROM events WHERE source_path = ? AND user_id = ?",
-                (source_path, user_id),
-            )
-            await db.commit()
-            return cursor.rowcount
+        db = await get_db()
+        cursor = await db.execute(
+            "DELETE FROM events WHERE source_path = ? AND user_id = ?",
+            (source_path, user_id),
+        )
+        await db.commit()
+        return cursor.rowcount
     except Exception:
         return 0
 
@@ -222,19 +409,25 @@ async def delete_past_events(user_id: str = DEFAULT_USER_ID) -> int:
     """Delete events with dates in the past for one user."""
     today = date.today().isoformat()
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            cursor = await db.execute(
-                "DELETE FROM events WHERE user_id = ? AND date IS NOT NULL AND date < ?",
-                (user_id, today),
-            )
-            await db.commit()
-            return cursor.rowcount
+        db = await get_db()
+        cursor = await db.execute(
+            "DELETE FROM events WHERE user_id = ? AND date IS NOT NULL AND date < ?",
+            (user_id, today),
+        )
+        await db.commit()
+        return cursor.rowcount
     except Exception:
         return 0
 
 
 # --- Webhook functions ---
 
+# Whether each user has any active webhooks. Most installs have none, and
+# without this every stored event pays a SQLite round-trip just to learn
+# that there is nobody to notify. Unknown users default to True so the
+# first call always checks the table.
+_has_webhooks_cache: dict[str, bool] = {}
+
 
 async def save_webhook(
     url: str,
@@ -242,55 +435,94 @@ async def save_webhook(
     user_id: str = DEFAULT_USER_ID,
 ) -> int:
     """Save (replace) the single active webhook for one user and return the row id."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        # One webhook per user by design: replace existing entries.
-        await db.execute("DELETE FROM webhooks WHERE user_id = ?", (user_id,))
+    db = await get_db()
+    # One webhook per user by design: a single upsert against the unique
+    # user index replaces the old delete-then-insert pair and keeps the
+    # existing row id stable. Legacy databases where the unique index could
+    # not be created fall back to the two-statement path.
+    try:
         cursor = await db.execute(
-            "INSERT INTO webhooks (user_id, url, label, is_active) VALUES (?, ?, ?, 1)",
+            """
+            INSERT INTO webhooks (user_id, url, label, is_active) VALUES (?, ?, ?, 1)
+            ON CONFLICT(user_id) DO UPDATE SET
+                url = excluded.url, label = excluded.label, is_active = 1
+            RETURNING id
+            """,
             (user_id, url, label),
         )
-        await db.commit()
-        return cursor.lastrowid
+        row = await cursor.fetchone()
+        _has_webhooks_cache[user_id] = True
+        return row[0]
+    except aiosqlite.OperationalError:
+        # Legacy fallback is two statements, so it needs an explicit
+        # transaction to stay atomic in autocommit mode.
+        async with _write_lock:
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                await db.execute("DELETE FROM webhooks WHERE user_id = ?", (user_id,))
+                cursor = await db.execute(
+                    "INSERT INTO webhooks (user_id, url, label, is_active) VALUES (?, ?, ?, 1)",
+                    (user_id, url, label),
+                )
+                await db.execute("COMMIT")
+            except Exception:
+                await db.execute("ROLLBACK")
+                raise
+    _has_webhooks_cache[user_id] = True
+    return cursor.lastrowid
 
 
 async def get_webhooks(user_id: str = DEFAULT_USER_ID) -> list[dict]:
     """Select active webhooks for one user."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute(
-            """
-            SELECT id, url, label, is_active, created_at
-            FROM webhooks
-            WHERE user_id = ? AND is_active = 1
-            """,
-            (user_id,),
-        )
-        rows = await cursor.fetchall()
-        return [
-            {
-                "id": row[0],
-                "url": row[1],
-                "label": row[2],
-                "is_active": bool(row[3]),
-                "created_at": row[4],
-            }
-            for row in rows
-        ]
+    db = await get_db()
+    cursor = await db.execute(
+        """
+        SELECT id, url, label, is_active, created_at
+        FROM webhooks
+        WHERE user_id = ? AND is_active = 1
+        """,
+        (user_id,),
+    )
+    rows = await cursor.fetchall()
+    webhooks = []
+    for row in rows:
+        webhook = dict(row)
+        webhook["is_active"] = bool(webhook["is_active"])
+        webhooks.append(webhook)
+    _has_webhooks_cache[user_id] = bool(webhooks)
+    return webhooks
 
 
 async def delete_webhook(webhook_id: int, user_id: str = DEFAULT_USER_ID) -> bool:
     """Delete a webhook by id for one user."""
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            cursor = await db.execute(
-                "DELETE FROM webhooks WHERE id = ? AND user_id = ?", (webhook_id, user_id)
-            )
-            await db.commit()
-            return cursor.rowcount > 0
+        db = await get_db()
+        cursor = await db.execute(
+            "DELETE FROM webhooks WHERE id = ? AND user_id = ?", (webhook_id, user_id)
+        )
+        await db.commit()
+        # Recheck on the next call rather than guessing.
+        _has_webhooks_cache.pop(user_id, None)
+        return cursor.rowcount > 0
     except Exception:
         return False
 
 
+def _embed_payload(title: str, description: str, date: str | None) -> dict:
+    """Build the Discord embed payload for one event reminder."""
+    return {
+        "embeds": [
+            {
+                "title": f"Reminder: {title}",
+                "description": description,
+                "color": 0x2A7FFF,
+                "fields": [{"name": "Date", "value": date, "inline": True}] if date else [],
+                "footer": {"text": "Forgot Me"},
+            }
+        ]
+    }
+
+
 async def trigger_webhooks(
     title: str,
     description: str,
@@ -299,33 +531,37 @@ async def trigger_webhooks(
     webhook_id: int | None = None,
 ) -> int:
     """POST to user-scoped webhook URLs using Discord embed format."""
+    if not _has_webhooks_cache.get(user_id, True):
+        return 0
     webhooks = await get_webhooks(user_id=user_id)
     if webhook_id is not None:
         webhooks = [w for w in webhooks if w["id"] == webhook_id]
     if not webhooks:
         return 0
 
-    payload = {
-        "embeds": [
-            {
-                "title": f"Reminder: {title}",
-                "description": description,
-                "color": 0x2A7FFF,
-                "fields": [{"name": "Date", "value": date, "inline": True}] if date else [],
-                "footer": {"text": "Forgot Me"},
-            }
-        ]
-    }
+    # Serialize once with orjson instead of letting httpx re-encode the
+    # payload per endpoint through stdlib json.
+    body = orjson.dumps(_embed_payload(title, description, date))
+    headers = {"content-type": "application/json"}
+
+    # Deliver concurrently: total latency is the slowest endpoint's RTT
+    # instead of the sum, and one stalled Discord server no longer holds up
+    # the rest of the fan-out.
+    client = get_http_client()
+    responses = await asyncio.gather(
+        *(
+            client.post(webhook["url"], content=body, headers=headers)
+            for webhook in webhooks
+        ),
+        return_exceptions=True,
+    )
 
     success_count = 0
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        for webhook in webhooks:
-            try:
-                resp = await client.post(webhook["url"], json=payload)
-                if resp.status_code < 300:
-                    success_count += 1
-            except Exception:
-                logger.warning("Failed to deliver webhook to id=%s", webhook["id"])
+    for webhook, resp in zip(webhooks, responses):
+        if isinstance(resp, BaseException):
+            logger.warning("Failed to deliver webhook to id=%s", webhook["id"])
+        elif resp.status_code < 300:
+            success_count += 1
     return success_count
 
 
@@ -335,13 +571,13 @@ async def clear_all_events(user_id: str | None = DEFAULT_USER_ID) -> int:
     Returns the number of events deleted.
     """
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            if user_id is None:
-                cursor = await db.execute("DELETE FROM events")
-            else:
-                cursor = await db.execute("DELETE FROM events WHERE user_id = ?", (user_id,))
-            await db.commit()
-            return cursor.rowcount
+        db = await get_db()
+        if user_id is None:
+            cursor = await db.execute("DELETE FROM events")
+        else:
+            cursor = await db.execute("DELETE FROM events WHERE user_id = ?", (user_id,))
+        await db.commit()
+        return cursor.rowcount
     except Exception as e:
         logger.error("Error clearing events: %s", e)
         return 0
@@ -0,0 +1,160 @@
+import json
+import logging
+import os
+import time
+from functools import wraps
+
+import aiosqlite
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Persistent cache path — survives restarts, like the events DB
+CACHE_PATH = os.getenv("SEMANTIC_CACHE_PATH", "./semantic_cache.db")
+CACHE_ENABLED = os.getenv("SEMANTIC_CACHE", "1") == "1"
+
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_TTL = 24 * 3600  # 24h
+
+# Flipped to False the first time the embedder is unusable (e.g. model weights
+# missing) so later calls don't pay the load attempt again.
+_embedder_usable = True
+# Cap how many candidate vectors a lookup scans per namespace
+MAX_CANDIDATES = 512
+
+INIT_SQL = """
+CREATE TABLE IF NOT EXISTS semantic_cache (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    namespace TEXT NOT NULL,
+    embedding BLOB NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+INIT_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_semcache_ns_exp
+ON semantic_cache(namespace, expires_at);
+"""
+
+
+def _embed(text: str) -> np.ndarray:
+    """L2-normalized embedding of the cache key text (reuses the MiniLM model)."""
+    from services import vector_store
+
+    vec = np.asarray(vector_store.embed_text(text), dtype=np.float32)
+    norm = float(np.linalg.norm(vec))
+    if norm > 0:
+        vec /= norm
+    return vec
+
+
+async def lookup(
+    namespace: str,
+    embedding: np.ndarray,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> str | None:
+    """Return the stored response whose key embedding is closest, if ≥ threshold."""
+    now = time.time()
+    async with aiosqlite.connect(CACHE_PATH) as db:
+        await db.execute(INIT_SQL)
+        await db.execute(INIT_INDEX_SQL)
+        cursor = await db.execute(
+            """
+            SELECT embedding, response
+            FROM semantic_cache
+            WHERE namespace = ? AND expires_at > ?
+            ORDER BY id DESC
+            LIMIT ?
+            """,
+            (namespace, now, MAX_CANDIDATES),
+        )
+        rows = await cursor.fetchall()
+
+    if not rows:
+        return None
+
+    candidates = np.frombuffer(b"".join(row[0] for row in rows), dtype=np.float32)
+    candidates = candidates.reshape(len(rows), -1)
+    scores = candidates @ embedding
+    best = int(np.argmax(scores))
+    if scores[best] >= threshold:
+        return rows[best][1]
+    return None
+
+
+async def store(
+    namespace: str,
+    embedding: np.ndarray,
+    response: str,
+    ttl: float = DEFAULT_TTL,
+) -> None:
+    """Insert a response keyed by its embedding; expired rows are pruned lazily."""
+    now = time.time()
+    async with aiosqlite.connect(CACHE_PATH) as db:
+        await db.execute(INIT_SQL)
+        await db.execute(INIT_INDEX_SQL)
+        await db.execute(
+            "DELETE FROM semantic_cache WHERE namespace = ? AND expires_at <= ?",
+            (namespace, now),
+        )
+        await db.execute(
+            """
+            INSERT INTO semantic_cache (namespace, embedding, response, created_at, expires_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (namespace, embedding.astype(np.float32).tobytes(), response, now, now + ttl),
+        )
+        await db.commit()
+
+
+def semantic_cached(
+    key,
+    namespace: str,
+    threshold: float = DEFAULT_THRESHOLD,
+    ttl: float = DEFAULT_TTL,
+):
+    """
+    Decorator: cache an async function's JSON-serializable result, keyed by the
+    embedding of `key(*args, **kwargs)`. A hit within `threshold` cosine
+    similarity skips the wrapped call entirely.
+
+    The cache fails open: if the embedder or SQLite is unavailable, the wrapped
+    function is called as if no cache existed.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            global _embedder_usable
+            if not CACHE_ENABLED or not _embedder_usable:
+                return await func(*args, **kwargs)
+
+            embedding = None
+            try:
+                embedding = _embed(key(*args, **kwargs))
+            except Exception:
+                logger.warning("Semantic cache disabled: embedder unavailable")
+                _embedder_usable = False
+                return await func(*args, **kwargs)
+
+            try:
+                cached = await lookup(namespace, embedding, threshold)
+                if cached is not None:
+                    return json.loads(cached)
+            except Exception:
+                logger.debug("Semantic cache lookup failed, calling through")
+
+            result = await func(*args, **kwargs)
+
+            if embedding is not None:
+                try:
+                    await store(namespace, embedding, json.dumps(result), ttl)
+                except Exception:
+                    logger.debug("Semantic cache store failed, ignoring")
+            return result
+
+        return wrapper
+
+    return decorator
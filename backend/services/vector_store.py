@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import hashlib
+import heapq
 import logging
 import os
+import sqlite3
+import threading
+from collections import OrderedDict
 
 import chromadb
+import numpy as np
 from models.schemas import MemoryItem
 from sentence_transformers import SentenceTransformer
 
@@ -20,14 +26,58 @@ _collection: chromadb.Collection | None = None
 _embedder: SentenceTransformer | None = None
 
 
+# Inference backend for the embedder. "onnx" runs MiniLM through ONNX
+# Runtime (2-4x faster per encode on CPU, needs the optional
+# sentence-transformers[onnx] extra); default is the stock torch path.
+EMBEDDER_BACKEND = os.getenv("EMBEDDER_BACKEND", "torch")
+
+_embedder_lock = threading.Lock()
+
+
 def get_embedder() -> SentenceTransformer:
-    """Lazy-load the sentence transformer model once."""
+    """Lazy-load the sentence transformer model once (thread-safe)."""
     global _embedder
-    if _embedder is None:
+    if _embedder is not None:
+        return _embedder
+    # Double-checked lock: racing cold-path callers (the preload thread vs.
+    # the first request) must not each load ~90MB of weights.
+    with _embedder_lock:
+        if _embedder is not None:
+            return _embedder
+        if EMBEDDER_BACKEND != "torch":
+            try:
+                _embedder = SentenceTransformer(
+                    "all-MiniLM-L6-v2", backend=EMBEDDER_BACKEND
+                )
+                return _embedder
+            except Exception:
+                logger.warning(
+                    "Embedder backend %r unavailable, falling back to torch",
+                    EMBEDDER_BACKEND,
+                )
         _embedder = SentenceTransformer("all-MiniLM-L6-v2")
+        # Half-precision on GPU: halves weight memory traffic for a model
+        # whose outputs we re-normalize anyway. Opt-in because fp16 on CPU
+        # is emulated and slower.
+        if os.getenv("EMBEDDER_HALF") == "1":
+            try:
+                import torch
+
+                if torch.cuda.is_available():
+                    _embedder = _embedder.half()
+                else:
+                    logger.warning("EMBEDDER_HALF=1 ignored: no CUDA device")
+            except ImportError:
+                pass
     return _embedder
 
 
+def warmup() -> None:
+    """Load the embedder and run one encode so the first real request sees
+    steady-state latency instead of paying model load + first-batch setup."""
+    get_embedder().encode(["warmup"], convert_to_numpy=True, show_progress_bar=False)
+
+
 def get_client() -> chromadb.PersistentClient:
     global _client
     if _client is None:
@@ -35,6 +85,30 @@ def get_client() -> chromadb.PersistentClient:
     return _client
 
 
+def _collection_metadata() -> dict:
+    """HNSW parameters for collection creation.
+
+    Chroma's defaults trade recall for build speed; the env knobs let a
+    deployment raise M/ef without a redeploy. They only apply when the
+    collection is first created — Chroma keeps the original parameters for
+    existing collections.
+    """
+    # Every vector we upsert is L2-normalized, so "ip" (inner product) gives
+    # the same ranking as cosine while skipping the per-comparison norms in
+    # the HNSW inner loop; for unit vectors both report distance = 1 - dot.
+    # Default stays cosine because existing collections were built with it.
+    metadata: dict = {"hnsw:space": os.getenv("CHROMA_HNSW_SPACE", "cosine")}
+    for env_var, key in (
+        ("CHROMA_HNSW_M", "hnsw:M"),
+        ("CHROMA_HNSW_CONSTRUCTION_EF", "hnsw:construction_ef"),
+        ("CHROMA_HNSW_SEARCH_EF", "hnsw:search_ef"),
+    ):
+        value = os.getenv(env_var)
+        if value:
+            metadata[key] = int(value)
+    return metadata
+
+
 def get_collection() -> chromadb.Collection:
     """Get or create the main collection. ChromaDB handles dedup by ID."""
     global _collection
@@ -42,15 +116,409 @@ def get_collection() -> chromadb.Collection:
         client = get_client()
         _collection = client.get_or_create_collection(
             name=COLLECTION_NAME,
-            metadata={"hnsw:space": "cosine"},  # cosine similarity for semantic search
+            metadata=_collection_metadata(),
         )
     return _collection
 
 
-def embed_text(text: str) -> list[float]:
-    """Generate a 384-dim embedding vector from text."""
-    model = get_embedder()
-    return model.encode(text).tolist()
+# Cached collection.count(): every read path probes the count first, which
+# is a full COUNT over Chroma's internal SQLite table. Writes invalidate
+# rather than adjust, because upsert can't tell an insert from an update.
+_count_cache: int | None = None
+
+
+def _collection_count() -> int:
+    global _count_cache
+    if _count_cache is None:
+        _count_cache = get_collection().count()
+    return _count_cache
+
+
+def _invalidate_count() -> None:
+    global _count_cache
+    _count_cache = None
+
+
+# Persistent embedding cache living beside the Chroma data. Re-ingesting a
+# file (restart, re-sync, schema change) hits this instead of re-running the
+# model forward pass — usually the biggest per-document cost. Vectors are
+# stored as float16 blobs: half the disk for negligible cosine drift.
+EMB_CACHE_FILE = "emb_cache.db"
+
+_emb_cache: sqlite3.Connection | None = None
+_emb_cache_path: str | None = None
+
+# In-memory LRU tier above the disk cache: repeated queries (the same
+# question re-asked, the badge poll re-embedding a description) skip even
+# the SQLite lookup. 4096 × 384 float32 tops out around 6MB.
+_MEM_CACHE_MAX = 4096
+_mem_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+
+
+def _mem_cache_put(key: str, vec: np.ndarray) -> None:
+    _mem_cache[key] = vec
+    _mem_cache.move_to_end(key)
+    while len(_mem_cache) > _MEM_CACHE_MAX:
+        _mem_cache.popitem(last=False)
+
+
+def _get_emb_cache() -> sqlite3.Connection:
+    """Open (or reuse) the cache DB, reconnecting if CHROMA_PATH changed."""
+    global _emb_cache, _emb_cache_path
+    path = os.path.join(CHROMA_PATH, EMB_CACHE_FILE)
+    if _emb_cache is None or _emb_cache_path != path:
+        if _emb_cache is not None:
+            _emb_cache.close()
+        os.makedirs(CHROMA_PATH, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS emb_cache (hash TEXT PRIMARY KEY, vec BLOB)"
+        )
+        # Shadow metadata index: Chroma can only filter metadata by walking
+        # every candidate, so the user/category/modality listings pre-filter
+        # here and hydrate just the matching ids from Chroma.
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS docs (
+                doc_id TEXT PRIMARY KEY,
+                user_id TEXT,
+                category TEXT,
+                modality TEXT,
+                timestamp TEXT,
+                file_name TEXT,
+                description TEXT
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_docs_user_cat ON docs(user_id, category, modality)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_docs_user_ts ON docs(user_id, timestamp DESC)"
+        )
+        _init_fts(conn)
+        conn.commit()
+        _emb_cache = conn
+        _emb_cache_path = path
+    return _emb_cache
+
+
+def _l2_normalize(vec: np.ndarray) -> np.ndarray:
+    """Scale to unit length: keeps every component in fp16's sweet spot and
+    makes cosine similarity a plain dot product downstream."""
+    norm = float(np.linalg.norm(vec))
+    if norm > 0:
+        vec /= norm
+    return vec
+
+
+def _emb_cache_get(text: str) -> tuple[str, np.ndarray | None]:
+    """Return (cache key, cached vector or None) for a text."""
+    key = hashlib.sha256(text.encode()).hexdigest()
+    if key in _mem_cache:
+        _mem_cache.move_to_end(key)
+        return key, _mem_cache[key]
+    try:
+        row = _get_emb_cache().execute(
+            "SELECT vec FROM emb_cache WHERE hash = ?", (key,)
+        ).fetchone()
+    except sqlite3.Error:
+        return key, None
+    if row is None:
+        return key, None
+    # Normalize on read too so entries written before normalization landed
+    # come back as unit vectors.
+    vec = _l2_normalize(np.frombuffer(row[0], dtype=np.float16).astype(np.float32))
+    _mem_cache_put(key, vec)
+    return key, vec
+
+
+def _emb_cache_put(items: list[tuple[str, np.ndarray]]) -> None:
+    if not items:
+        return
+    for key, vec in items:
+        _mem_cache_put(key, np.asarray(vec, dtype=np.float32))
+    try:
+        conn = _get_emb_cache()
+        conn.executemany(
+            "INSERT OR REPLACE INTO emb_cache (hash, vec) VALUES (?, ?)",
+            [
+                (key, np.asarray(vec, dtype=np.float16).tobytes())
+                for key, vec in items
+            ],
+        )
+        conn.commit()
+    except sqlite3.Error:
+        logger.debug("Embedding cache write failed, continuing uncached")
+
+
+# Full-text search over file_name/description. FTS5 ships with every
+# CPython sqlite3 build we target, but stays optional: if the virtual
+# table can't be created, search falls back to the Python substring scan.
+_fts_enabled = True
+
+
+def _init_fts(conn: sqlite3.Connection) -> None:
+    global _fts_enabled
+    try:
+        created = (
+            conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='docs_fts'"
+            ).fetchone()
+            is None
+        )
+        conn.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+                file_name, description,
+                content='docs', content_rowid='rowid',
+                tokenize='porter unicode61'
+            )
+            """
+        )
+        conn.executescript(
+            """
+            CREATE TRIGGER IF NOT EXISTS docs_fts_ai AFTER INSERT ON docs BEGIN
+                INSERT INTO docs_fts(rowid, file_name, description)
+                VALUES (new.rowid, new.file_name, new.description);
+            END;
+            CREATE TRIGGER IF NOT EXISTS docs_fts_ad AFTER DELETE ON docs BEGIN
+                INSERT INTO docs_fts(docs_fts, rowid, file_name, description)
+                VALUES ('delete', old.rowid, old.file_name, old.description);
+            END;
+            CREATE TRIGGER IF NOT EXISTS docs_fts_au AFTER UPDATE ON docs BEGIN
+                INSERT INTO docs_fts(docs_fts, rowid, file_name, description)
+                VALUES ('delete', old.rowid, old.file_name, old.description);
+                INSERT INTO docs_fts(rowid, file_name, description)
+                VALUES (new.rowid, new.file_name, new.description);
+            END;
+            """
+        )
+        if created:
+            # Index rows written before the FTS table existed.
+            conn.execute("INSERT INTO docs_fts(docs_fts) VALUES ('rebuild')")
+        _fts_enabled = True
+    except sqlite3.Error:
+        logger.warning("FTS5 unavailable; memory search will use substring scan")
+        _fts_enabled = False
+
+
+def _fts_search(
+    query: str,
+    user_id: str | None,
+    category: str | None,
+    limit: int,
+) -> list[str] | None:
+    """Resolve doc_ids matching a text query via FTS5, best match first.
+
+    Returns None when FTS is unavailable so the caller can fall back.
+    """
+    if not _fts_enabled or not _ensure_shadow():
+        return None
+    # Quote the user's query so FTS operators in it can't break the MATCH
+    # expression; the trailing * keeps the old substring-ish prefix feel.
+    match = '"' + query.replace('"', '""') + '"*'
+    sql = (
+        "SELECT d.doc_id FROM docs_fts f JOIN docs d ON d.rowid = f.rowid "
+        "WHERE docs_fts MATCH ?"
+    )
+    params: list = [match]
+    if user_id:
+        sql += " AND d.user_id = ?"
+        params.append(user_id)
+    if category:
+        sql += " AND d.category = ?"
+        params.append(category)
+    sql += " ORDER BY rank LIMIT ?"
+    params.append(limit)
+    try:
+        rows = _get_emb_cache().execute(sql, params).fetchall()
+    except sqlite3.Error:
+        return None
+    return [row[0] for row in rows]
+
+
+def _like_search(
+    query: str,
+    user_id: str | None,
+    category: str | None,
+    limit: int,
+) -> list[str] | None:
+    """Substring search over the shadow index for builds without FTS5.
+
+    Still an O(N) scan, but it runs inside SQLite over two columns instead
+    of pulling every metadata row into Python first.
+    """
+    if not _ensure_shadow():
+        return None
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    pattern = f"%{escaped}%"
+    sql = (
+        "SELECT doc_id FROM docs "
+        "WHERE (file_name LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\')"
+    )
+    params: list = [pattern, pattern]
+    if user_id:
+        sql += " AND user_id = ?"
+        params.append(user_id)
+    if category:
+        sql += " AND category = ?"
+        params.append(category)
+    sql += " ORDER BY timestamp DESC LIMIT ?"
+    params.append(limit)
+    try:
+        rows = _get_emb_cache().execute(sql, params).fetchall()
+    except sqlite3.Error:
+        return None
+    return [row[0] for row in rows]
+
+
+def _shadow_row(doc_id: str, metadata: dict) -> tuple:
+    return (
+        doc_id,
+        metadata.get("user_id", DEFAULT_USER_ID),
+        metadata.get("category", ""),
+        metadata.get("modality", ""),
+        metadata.get("timestamp", ""),
+        metadata.get("file_name", ""),
+        metadata.get("description", ""),
+    )
+
+
+def _shadow_upsert(rows: list[tuple]) -> None:
+    if not rows:
+        return
+    try:
+        conn = _get_emb_cache()
+        conn.executemany(
+            "INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+        )
+        conn.commit()
+    except sqlite3.Error:
+        logger.debug("Shadow index write failed, continuing without it")
+
+
+def _shadow_delete(doc_ids: list[str]) -> None:
+    if not doc_ids:
+        return
+    try:
+        conn = _get_emb_cache()
+        conn.executemany("DELETE FROM docs WHERE doc_id = ?", [(i,) for i in doc_ids])
+        conn.commit()
+    except sqlite3.Error:
+        logger.debug("Shadow index delete failed, continuing without it")
+
+
+def _ensure_shadow() -> bool:
+    """Backfill the shadow index from Chroma for pre-existing stores.
+
+    Returns False when the index can't be used (SQLite error), in which
+    case callers fall back to Chroma-side filtering.
+    """
+    try:
+        conn = _get_emb_cache()
+        shadow_count = conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+        if shadow_count > 0 or _collection_count() == 0:
+            return True
+        result = get_collection().get(include=["metadatas"])
+        _shadow_upsert(
+            [
+                _shadow_row(doc_id, meta or {})
+                for doc_id, meta in zip(result["ids"], result["metadatas"])
+            ]
+        )
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def _shadow_ids(
+    user_id: str | None,
+    *,
+    category: str | None = None,
+    modality: str | None = None,
+    limit: int | None = None,
+) -> list[str] | None:
+    """Resolve matching doc_ids from the shadow index, newest first.
+
+    Returns None when the index is unavailable so callers can fall back to
+    Chroma-side filtering.
+    """
+    if not _ensure_shadow():
+        return None
+    sql = "SELECT doc_id FROM docs"
+    conditions = []
+    params: list = []
+    if user_id:
+        conditions.append("user_id = ?")
+        params.append(user_id)
+    if category:
+        conditions.append("category = ?")
+        params.append(category)
+    if modality:
+        conditions.append("modality = ?")
+        params.append(modality)
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY timestamp DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    try:
+        rows = _get_emb_cache().execute(sql, params).fetchall()
+    except sqlite3.Error:
+        return None
+    return [row[0] for row in rows]
+
+
+def embed_text(text: str) -> np.ndarray:
+    """Generate a 384-dim float32 embedding vector from text (disk-cached).
+
+    Returned as an ndarray: Chroma accepts it directly, and converting to a
+    Python list would allocate 384 float objects per call for nothing.
+    """
+    key, cached = _emb_cache_get(text)
+    if cached is not None:
+        return cached
+    vec = _l2_normalize(np.asarray(get_embedder().encode(text), dtype=np.float32))
+    _emb_cache_put([(key, vec)])
+    return vec
+
+
+def embed_texts(texts: list[str]) -> list[np.ndarray]:
+    """Embed several texts, batching cache misses into one forward pass."""
+    keys: list[str] = []
+    vectors: list[np.ndarray | None] = []
+    misses: list[int] = []
+    for i, text in enumerate(texts):
+        key, cached = _emb_cache_get(text)
+        keys.append(key)
+        vectors.append(cached)
+        if cached is None:
+            misses.append(i)
+
+    if misses:
+        # Sort misses by length so each encode batch holds similarly-sized
+        # texts and short ones aren't padded out to the longest in the batch.
+        misses.sort(key=lambda i: len(texts[i]), reverse=True)
+        encoded = np.atleast_2d(
+            np.asarray(
+                get_embedder().encode(
+                    [texts[i] for i in misses],
+                    batch_size=32,
+                    convert_to_numpy=True,
+                    show_progress_bar=False,
+                )
+            )
+        )
+        fresh = [
+            _l2_normalize(np.asarray(vec, dtype=np.float32)) for vec in encoded
+        ]
+        for i, vec in zip(misses, fresh):
+            vectors[i] = vec
+        _emb_cache_put([(keys[i], vec) for i, vec in zip(misses, fresh)])
+
+    return vectors
 
 
 def _where_with_user(
@@ -92,6 +560,55 @@ def store_document(
         documents=[description],
         metadatas=[metadata],
     )
+    _shadow_upsert([_shadow_row(doc_id, metadata)])
+    _invalidate_count()
+    _invalidate_matrix()
+
+
+def store_document_batch(
+    doc_ids: list[str],
+    descriptions: list[str],
+    metadatas: list[dict],
+) -> None:
+    """
+    Store several documents in one ChromaDB call.
+    Embeds all descriptions in a single model pass and issues one upsert, so
+    Chroma's per-call SQLite transaction cost is paid once per batch.
+    """
+    if not doc_ids:
+        return
+    collection = get_collection()
+    embeddings = embed_texts(descriptions)
+    collection.upsert(
+        ids=doc_ids,
+        embeddings=embeddings,
+        documents=descriptions,
+        metadatas=metadatas,
+    )
+    _shadow_upsert(
+        [_shadow_row(doc_id, meta) for doc_id, meta in zip(doc_ids, metadatas)]
+    )
+    _invalidate_count()
+    _invalidate_matrix()
+
+
+def update_metadata(
+    doc_id: str,
+    updates: dict,
+    user_id: str = DEFAULT_USER_ID,
+) -> bool:
+    """Merge new fields into a stored document's metadata without re-embedding."""
+    doc = get_document(doc_id, user_id=user_id)
+    if doc is None:
+        return False
+    metadata = {
+        k: v for k, v in doc.items() if k not in ("doc_id", "document", "distance")
+    }
+    metadata.update(updates)
+    collection = get_collection()
+    collection.update(ids=[doc_id], metadatas=[metadata])
+    _shadow_upsert([_shadow_row(doc_id, metadata)])
+    return True
 
 
 def query_documents(
@@ -104,7 +621,7 @@ def query_documents(
     Returns list of metadata dicts with distance scores.
     """
     collection = get_collection()
-    total_count = collection.count()
+    total_count = _collection_count()
     if total_count == 0:
         return []
 
@@ -116,16 +633,18 @@ def query_documents(
         include=["metadatas", "documents", "distances"],
     )
 
-    documents = []
     ids = results.get("ids", [[]])
     if not ids or not ids[0]:
         return []
 
-    for i in range(len(ids[0])):
-        meta = (results["metadatas"][0][i] or {}).copy()
-        meta["distance"] = results["distances"][0][i]
-        meta["document"] = results["documents"][0][i]
-        meta["doc_id"] = ids[0][i]
+    documents = []
+    for doc_id, meta, distance, document in zip(
+        ids[0], results["metadatas"][0], results["distances"][0], results["documents"][0]
+    ):
+        meta = (meta or {}).copy()
+        meta["distance"] = distance
+        meta["document"] = document
+        meta["doc_id"] = doc_id
         documents.append(meta)
     return documents
 
@@ -138,19 +657,38 @@ def get_all_memories(
 ) -> list[MemoryItem]:
     """Fetch stored memories with optional filtering."""
     collection = get_collection()
-    if collection.count() == 0:
+    if _collection_count() == 0:
         return []
 
-    result = collection.get(
-        where=_where_with_user(user_id, category=category, modality=modality),
-        limit=limit,
-        include=["metadatas"],
-    )
+    # Push ordering and the limit into the shadow index: SQLite returns the
+    # newest `limit` ids directly, so we never pull (or sort) every matching
+    # metadata row out of Chroma.
+    ids = _shadow_ids(user_id, category=category, modality=modality, limit=limit)
+    if ids is not None:
+        if not ids:
+            return []
+        result = collection.get(ids=ids, include=["metadatas"])
+        # collection.get doesn't preserve id order; restore the shadow's.
+        by_id = dict(zip(result["ids"], result["metadatas"]))
+        ordered = [(doc_id, by_id[doc_id]) for doc_id in ids if doc_id in by_id]
+    else:
+        result = collection.get(
+            where=_where_with_user(user_id, category=category, modality=modality),
+            limit=limit,
+            include=["metadatas"],
+        )
+        # nlargest keeps a limit-sized heap instead of sorting all N rows.
+        ordered = heapq.nlargest(
+            limit,
+            zip(result["ids"], result["metadatas"]),
+            key=lambda pair: (pair[1] or {}).get("timestamp", ""),
+        )
 
     memories = []
-    for i, meta in enumerate(result["metadatas"]):
+    for doc_id, meta in ordered[:limit]:
+        meta = meta or {}
         memories.append(
-            MemoryItem(
+            MemoryItem.model_construct(
                 file_path=meta.get("file_path", ""),
                 file_name=meta.get("file_name", ""),
                 modality=meta.get("modality", ""),
@@ -160,14 +698,11 @@ def get_all_memories(
                 timestamp=meta.get("timestamp", ""),
                 file_date="",
                 has_events=meta.get("has_events", False),
-                doc_id=result["ids"][i] if i < len(result["ids"]) else "",
+                doc_id=doc_id,
                 content_hash=meta.get("content_hash", ""),
             )
         )
-
-    # Sort by ingestion timestamp descending (newest first)
-    memories.sort(key=lambda m: m.timestamp, reverse=True)
-    return memories[:limit]
+    return memories
 
 
 def check_connection() -> bool:
@@ -183,10 +718,20 @@ def check_connection() -> bool:
 def delete_document(doc_id: str, user_id: str = DEFAULT_USER_ID) -> bool:
     """Delete a document from ChromaDB by ID."""
     try:
-        if get_document(doc_id, user_id=user_id) is None:
-            return False
         collection = get_collection()
+        # Ownership probe: metadata only — the full get_document fetch
+        # would drag the document text (and formerly the embedding) along
+        # just to read one user_id field.
+        result = collection.get(ids=[doc_id], include=["metadatas"])
+        if not result["ids"]:
+            return False
+        meta = result["metadatas"][0] or {}
+        if user_id and meta.get("user_id", DEFAULT_USER_ID) != user_id:
+            return False
         collection.delete(ids=[doc_id])
+        _shadow_delete([doc_id])
+        _invalidate_count()
+        _invalidate_matrix()
         return True
     except Exception:
         return False
@@ -196,9 +741,7 @@ def get_document(doc_id: str, user_id: str = DEFAULT_USER_ID) -> dict | None:
     """Get a single document's metadata by ID."""
     try:
         collection = get_collection()
-        result = collection.get(
-            ids=[doc_id], include=["metadatas", "documents", "embeddings"]
-        )
+        result = collection.get(ids=[doc_id], include=["metadatas", "documents"])
         if not result["ids"]:
             return None
         meta = (result["metadatas"][0] or {}).copy()
@@ -217,44 +760,42 @@ def get_related_documents(
     top_k: int = 5,
     user_id: str = DEFAULT_USER_ID,
 ) -> list[dict]:
-    """Find documents similar to a given document."""
+    """Find documents similar to a given document.
+
+    Runs against the cached embedding matrix: one SGEMV plus an
+    argpartition replaces the embedding fetch + HNSW query round-trips,
+    and only the winning ids are hydrated from Chroma.
+    """
     collection = get_collection()
-    if collection.count() <= 1:
+    if _collection_count() <= 1:
         return []
 
-    # Get the document's embedding and scope by user.
-    result = collection.get(ids=[doc_id], include=["embeddings", "documents", "metadatas"])
-    if not result["ids"] or not result["embeddings"]:
+    ids, matrix = get_embedding_matrix(user_id)
+    if matrix.size == 0 or doc_id not in ids:
+        # Unknown id or not this user's document (the matrix is user-scoped).
         return []
-
-    doc_meta = (result["metadatas"][0] or {}) if result.get("metadatas") else {}
-    if user_id and doc_meta.get("user_id", DEFAULT_USER_ID) != user_id:
+    idx = ids.index(doc_id)
+
+    sims = matrix @ matrix[idx]
+    k = min(top_k + 1, len(ids))  # +1 because the doc itself is in the matrix
+    top = np.argpartition(-sims, k - 1)[:k]
+    top = top[np.argsort(-sims[top])]
+    related_ids = [ids[i] for i in top if ids[i] != doc_id][:top_k]
+    if not related_ids:
         return []
+    sim_by_id = {ids[i]: float(sims[i]) for i in top}
 
-    embedding = result["embeddings"][0]
-
-    # Query for similar docs (top_k + 1 because the doc itself will be in results)
-    results = collection.query(
-        query_embeddings=[embedding],
-        n_results=min(max(top_k + 1, 1), collection.count()),
-        where=_where_with_user(user_id),
-        include=["metadatas", "documents", "distances"],
-    )
-
+    result = collection.get(ids=related_ids, include=["metadatas"])
+    by_id = dict(zip(result["ids"], result["metadatas"]))
     related = []
-    ids = results.get("ids", [[]])
-    if not ids or not ids[0]:
-        return []
-
-    for i in range(len(ids[0])):
-        rid = ids[0][i]
-        if rid == doc_id:
-            continue  # Skip self
-        meta = (results["metadatas"][0][i] or {}).copy()
-        meta["distance"] = results["distances"][0][i]
+    for rid in related_ids:
+        if rid not in by_id:
+            continue
+        meta = (by_id[rid] or {}).copy()
+        meta["distance"] = 1.0 - sim_by_id[rid]
         meta["doc_id"] = rid
         related.append(meta)
-    return related[:top_k]
+    return related
 
 
 def get_documents_by_category(
@@ -263,35 +804,91 @@ def get_documents_by_category(
 ) -> list[dict]:
     """Get all documents in a category."""
     collection = get_collection()
-    if collection.count() == 0:
+    if _collection_count() == 0:
         return []
-    result = collection.get(
-        where=_where_with_user(user_id, category=category),
-        include=["metadatas"],
-    )
+    ids = _shadow_ids(user_id, category=category)
+    if ids is not None:
+        if not ids:
+            return []
+        result = collection.get(ids=ids, include=["metadatas"])
+    else:
+        result = collection.get(
+            where=_where_with_user(user_id, category=category),
+            include=["metadatas"],
+        )
     docs = []
-    for i, meta in enumerate(result["metadatas"]):
+    for doc_id, meta in zip(result["ids"], result["metadatas"]):
         doc = (meta or {}).copy()
-        doc["doc_id"] = result["ids"][i]
+        doc["doc_id"] = doc_id
         docs.append(doc)
     return docs
 
 
+# Materialized per-user embedding matrix. Building it costs one bulk get;
+# after that, similarity over the whole collection is a single BLAS matmul,
+# cheaper than even starting an HNSW query for the sizes this app sees.
+# Cleared whenever embeddings change.
+_matrix_cache: dict[str, tuple[list[str], np.ndarray]] = {}
+_matrix_lock = threading.Lock()
+
+
+def _invalidate_matrix() -> None:
+    _matrix_cache.clear()
+
+
+def get_embedding_matrix(
+    user_id: str = DEFAULT_USER_ID,
+) -> tuple[list[str], np.ndarray]:
+    """
+    All user-scoped embeddings as (doc_ids, contiguous L2-normalized float32
+    matrix of shape (N, D)). Handing the graph code one dense array instead
+    of N Python lists keeps the similarity matmul in a single BLAS call.
+    Cached per user until the next write.
+    """
+    cached = _matrix_cache.get(user_id)
+    if cached is not None:
+        return cached
+    # Serialize the rebuild: concurrent callers after an invalidation would
+    # otherwise each pull the full embedding set from Chroma.
+    with _matrix_lock:
+        cached = _matrix_cache.get(user_id)
+        if cached is not None:
+            return cached
+        collection = get_collection()
+        if _collection_count() == 0:
+            return [], np.empty((0, 0), dtype=np.float32)
+        result = collection.get(
+            where=_where_with_user(user_id),
+            include=["embeddings"],
+        )
+        ids = result["ids"]
+        embeddings = result.get("embeddings")
+        if embeddings is None or len(embeddings) == 0:
+            return ids, np.empty((0, 0), dtype=np.float32)
+        matrix = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32))
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-9
+        _matrix_cache[user_id] = (ids, matrix)
+        return ids, matrix
+
+
 def get_all_documents_with_metadata(user_id: str = DEFAULT_USER_ID) -> list[dict]:
-    """Get all user-scoped documents with metadata and embeddings for graph building."""
+    """Get all user-scoped documents with metadata for graph building.
+
+    Embeddings are deliberately excluded: the graph endpoints take them
+    from get_embedding_matrix, so ferrying 1.5KB of FP32 per document
+    through this call was pure dead weight.
+    """
     collection = get_collection()
-    if collection.count() == 0:
+    if _collection_count() == 0:
         return []
     result = collection.get(
         where=_where_with_user(user_id),
-        include=["metadatas", "embeddings", "documents"],
+        include=["metadatas"],
     )
     docs = []
-    for i in range(len(result["ids"])):
-        meta = (result["metadatas"][i] or {}).copy()
-        meta["doc_id"] = result["ids"][i]
-        if result["embeddings"]:
-            meta["_embedding"] = result["embeddings"][i]
+    for doc_id, meta in zip(result["ids"], result["metadatas"]):
+        meta = (meta or {}).copy()
+        meta["doc_id"] = doc_id
         docs.append(meta)
     return docs
 
@@ -304,38 +901,71 @@ def search_memories(
 ) -> list[MemoryItem]:
     """Search memories by text match on file_name and description."""
     collection = get_collection()
-    if collection.count() == 0:
+    if _collection_count() == 0:
         return []
 
+    # FTS5 path: inverted-index lookup ranked by bm25, independent of
+    # corpus size. Builds without FTS5 drop to an SQL LIKE over the shadow
+    # index, and only then to the Python substring scan.
+    ids = _fts_search(query, user_id, category, limit)
+    if ids is None:
+        ids = _like_search(query, user_id, category, limit)
+    if ids is not None:
+        if not ids:
+            return []
+        result = collection.get(ids=ids, include=["metadatas"])
+        by_id = dict(zip(result["ids"], result["metadatas"]))
+        return [
+            MemoryItem.model_construct(
+                file_path=meta.get("file_path", ""),
+                file_name=meta.get("file_name", ""),
+                modality=meta.get("modality", ""),
+                description=meta.get("description", ""),
+                category=meta.get("category", ""),
+                summary="",
+                timestamp=meta.get("timestamp", ""),
+                file_date="",
+                has_events=meta.get("has_events", False),
+                doc_id=doc_id,
+                content_hash=meta.get("content_hash", ""),
+            )
+            for doc_id in ids
+            if (meta := by_id.get(doc_id)) is not None
+        ]
+
     result = collection.get(
         where=_where_with_user(user_id, category=category),
         include=["metadatas"],
     )
 
     query_lower = query.lower()
-    memories = []
-    for i, meta in enumerate(result["metadatas"]):
-        file_name = meta.get("file_name", "").lower()
-        description = meta.get("description", "").lower()
-        if query_lower in file_name or query_lower in description:
-            memories.append(
-                MemoryItem(
-                    file_path=meta.get("file_path", ""),
-                    file_name=meta.get("file_name", ""),
-                    modality=meta.get("modality", ""),
-                    description=meta.get("description", ""),
-                    category=meta.get("category", ""),
-                    summary="",
-                    timestamp=meta.get("timestamp", ""),
-                    file_date="",
-                    has_events=meta.get("has_events", False),
-                    doc_id=result["ids"][i],
-                    content_hash=meta.get("content_hash", ""),
-                )
-            )
-
-    memories.sort(key=lambda m: m.timestamp, reverse=True)
-    return memories[:limit]
+    matches = [
+        (doc_id, meta)
+        for doc_id, meta in zip(result["ids"], result["metadatas"])
+        if query_lower in meta.get("file_name", "").lower()
+        or query_lower in meta.get("description", "").lower()
+    ]
+    # Select the newest `limit` matches before building MemoryItems, so
+    # model construction cost tracks the page size rather than the corpus.
+    newest = heapq.nlargest(
+        limit, matches, key=lambda pair: pair[1].get("timestamp", "")
+    )
+    return [
+        MemoryItem.model_construct(
+            file_path=meta.get("file_path", ""),
+            file_name=meta.get("file_name", ""),
+            modality=meta.get("modality", ""),
+            description=meta.get("description", ""),
+            category=meta.get("category", ""),
+            summary="",
+            timestamp=meta.get("timestamp", ""),
+            file_date="",
+            has_events=meta.get("has_events", False),
+            doc_id=doc_id,
+            content_hash=meta.get("content_hash", ""),
+        )
+        for doc_id, meta in newest
+    ]
 
 
 def clear_all_documents(user_id: str | None = DEFAULT_USER_ID) -> int:
@@ -345,7 +975,7 @@ def clear_all_documents(user_id: str | None = DEFAULT_USER_ID) -> int:
     """
     try:
         collection = get_collection()
-        if collection.count() == 0:
+        if _collection_count() == 0:
             return 0
 
         where = _where_with_user(user_id) if user_id else None
@@ -355,6 +985,9 @@ def clear_all_documents(user_id: str | None = DEFAULT_USER_ID) -> int:
             return 0
 
         collection.delete(ids=ids)
+        _shadow_delete(ids)
+        _invalidate_count()
+        _invalidate_matrix()
         return len(ids)
     except Exception as e:
         logger.error("Error clearing documents: %s", e)
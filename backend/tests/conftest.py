@@ -4,6 +4,7 @@ import sys
 # Ensure the backend package is importable
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+from collections import OrderedDict
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -11,23 +12,45 @@ import pytest_asyncio
 
 
 # -- Temp SQLite DB for notif_service tests --
+# Shared-cache in-memory URI: no file I/O, and every connection that opens
+# the same URI with uri=True sees the same database. The holder connection
+# keeps the in-memory DB alive across notif_service reconnects.
 @pytest_asyncio.fixture
-async def temp_db(tmp_path):
-    db_path = str(tmp_path / "test_mindvault.db")
-    with patch("services.notif_service.DB_PATH", db_path):
-        from services import notif_service
+async def temp_db():
+    import uuid
 
-        await notif_service.init_db()
-        yield db_path
+    import aiosqlite
 
+    db_uri = f"file:testdb_{uuid.uuid4().hex}?mode=memory&cache=shared"
+    holder = await aiosqlite.connect(db_uri, uri=True)
+    try:
+        with patch("services.notif_service.DB_PATH", db_uri):
+            from services import notif_service
 
-# -- Check if chromadb is importable (fails on Python 3.14 due to pydantic v1) --
-try:
-    import chromadb  # noqa: F401
+            await notif_service.init_db()
+            yield db_uri
+    finally:
+        await holder.close()
 
-    _chromadb_available = True
-except Exception:
-    _chromadb_available = False
+
+# -- Close the shared notif_service connection after every test --
+# The module-level aiosqlite connection runs a non-daemon worker thread; if a
+# test leaves it open the interpreter never exits and the session hangs after
+# the summary line.
+@pytest_asyncio.fixture(autouse=True)
+async def _close_notif_db():
+    yield
+    from services import notif_service
+
+    await notif_service.close_db()
+
+
+# -- Check if chromadb is installed without importing it --
+# find_spec inspects the meta path only, so conftest load never pays for
+# chromadb's heavy __init__ (pydantic, onnxruntime, ...).
+import importlib.util
+
+_chromadb_available = importlib.util.find_spec("chromadb") is not None
 
 
 # -- Temp ChromaDB for vector_store tests --
@@ -40,16 +63,19 @@ def temp_chroma(tmp_path):
         patch("services.vector_store.CHROMA_PATH", chroma_path),
         patch("services.vector_store._client", None),
         patch("services.vector_store._collection", None),
+        patch("services.vector_store._count_cache", None),
+        patch("services.vector_store._matrix_cache", {}),
+        patch("services.vector_store._mem_cache", OrderedDict()),
     ):
         yield chroma_path
 
 
 # -- Mock LLM (avoids needing Ollama running) --
 @pytest.fixture
-def mock_llm():
+def mock_llm(tmp_path):
     """Patch llm_service.generate to return canned responses."""
 
-    async def fake_generate(prompt, temperature=0.3):
+    async def fake_generate(prompt, temperature=0.3, format=None):
         lower = prompt.lower()
         if "description" in lower and "category" in lower:
             return '{"description": "Test document about testing", "category": "work", "summary": "A test file"}'
@@ -59,7 +85,17 @@ def mock_llm():
             return "YES"
         return "Based on the files, the answer is 42."
 
-    with patch("services.llm_service.generate", side_effect=fake_generate) as mock:
+    with (
+        # Keep every cache inside tmp_path and off the network: the exact
+        # cache gets a throwaway file, and the semantic cache is disabled
+        # outright so tests never touch the real embedder (offline runs would
+        # otherwise stall on a model download) or write DB files into the
+        # working tree.
+        patch("services.llm_cache.CACHE_PATH", str(tmp_path / "llm_cache.db")),
+        patch("services.semantic_cache.CACHE_PATH", str(tmp_path / "semantic_cache.db")),
+        patch("services.semantic_cache.CACHE_ENABLED", False),
+        patch("services.llm_service.generate", side_effect=fake_generate) as mock,
+    ):
         yield mock
 
 
@@ -77,6 +113,12 @@ def api_client(tmp_path, mock_llm):
         patch("services.vector_store.CHROMA_PATH", chroma_path),
         patch("services.vector_store._client", None),
         patch("services.vector_store._collection", None),
+        patch("services.vector_store._count_cache", None),
+        patch("services.vector_store._matrix_cache", {}),
+        patch("services.vector_store._mem_cache", OrderedDict()),
+        # The graph edge cache's fingerprint (doc count, per-second mtime)
+        # can collide across tests, so it gets a fresh dict too.
+        patch("main._graph_edge_cache", {}),
         patch("services.vector_store._embedder", None),
     ):
         from fastapi.testclient import TestClient
@@ -87,7 +129,9 @@ def api_client(tmp_path, mock_llm):
 
 
 # -- Sample file content fixtures --
-@pytest.fixture
+# Session-scoped: the bytes are immutable, so building them once per run
+# avoids spinning up PyMuPDF for every test that consumes them.
+@pytest.fixture(scope="session")
 def sample_pdf_bytes():
     """Minimal valid PDF with text."""
     import fitz
@@ -100,7 +144,19 @@ def sample_pdf_bytes():
     return pdf_bytes
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def empty_pdf_bytes():
+    """Valid PDF with a single blank page and no text."""
+    import fitz
+
+    doc = fitz.open()
+    doc.new_page()
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    return pdf_bytes
+
+
+@pytest.fixture(scope="session")
 def sample_ics_bytes():
     """Minimal valid .ics calendar file."""
     return b"""BEGIN:VCALENDAR
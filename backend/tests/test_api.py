@@ -54,6 +54,9 @@ class TestScanEndpoint:
         names = [f["file_name"] for f in data["files"]]
         assert "b.exe" not in names
         assert "a.pdf" in names
+        modalities = {f["file_name"]: f["modality"] for f in data["files"]}
+        assert modalities["a.pdf"] == "pdf"
+        assert modalities["d.jpg"] == "image"
 
     def test_scan_custom_extensions(self, api_client):
         resp = api_client.post(
@@ -78,8 +81,8 @@ class TestIngestEndpoint:
         content_b64 = base64.b64encode(b"Meeting notes from Monday standup").decode()
 
         fake_embedder = MagicMock()
-        fake_embedder.encode.side_effect = lambda text: (
-            np.random.RandomState(42).rand(384).astype(np.float32)
+        fake_embedder.encode.side_effect = lambda text, **kwargs: (
+            np.random.default_rng(42).standard_normal(384, dtype=np.float32)
         )
 
         with patch("services.vector_store._embedder", fake_embedder):
@@ -104,6 +107,22 @@ class TestIngestEndpoint:
             "other",
         ]
 
+    def test_ingest_raw_multipart(self, api_client):
+        fake_embedder = MagicMock()
+        fake_embedder.encode.side_effect = lambda text, **kwargs: (
+            np.random.default_rng(42).standard_normal(384, dtype=np.float32)
+        )
+
+        with patch("services.vector_store._embedder", fake_embedder):
+            resp = api_client.post(
+                "/ingest/raw",
+                data={"file_path": "/test/raw_notes.txt"},
+                files={"file": ("raw_notes.txt", b"Budget review notes", "text/plain")},
+            )
+
+        assert resp.status_code == 200
+        assert resp.json()["success"] is True
+
     def test_ingest_invalid_base64(self, api_client):
         resp = api_client.post(
             "/ingest",
@@ -118,6 +137,50 @@ class TestIngestEndpoint:
         assert data["success"] is False
 
 
+class TestBatchIngestEndpoint:
+    def test_batch_ingest_with_duplicate_paths(self, api_client):
+        def _vec(text):
+            return np.random.default_rng(42).standard_normal(384, dtype=np.float32)
+
+        fake_embedder = MagicMock()
+        # The batch path embeds all descriptions in one encode([...]) call.
+        fake_embedder.encode.side_effect = lambda text, **kwargs: (
+            np.stack([_vec(t) for t in text]) if isinstance(text, list) else _vec(text)
+        )
+
+        def entry(path, name, content):
+            return {
+                "file_path": path,
+                "file_content_base64": base64.b64encode(content).decode(),
+                "filename": name,
+            }
+
+        files = [
+            entry("/test/one.txt", "one.txt", b"Standup notes from Monday morning"),
+            entry("/test/two.txt", "two.txt", b"Quarterly budget breakdown"),
+            # Same path as the first entry with different bytes: doc ids are
+            # keyed on user+path, so these must collapse to one stored doc
+            # instead of crashing the single upsert.
+            entry("/test/one.txt", "one.txt", b"Standup notes, revised"),
+        ]
+
+        with patch("services.vector_store._embedder", fake_embedder):
+            resp = api_client.post("/ingest/batch", json={"files": files})
+
+            assert resp.status_code == 200
+            data = resp.json()
+            assert data["total"] == 3
+            assert data["successful"] == 3
+            assert all(r["success"] for r in data["results"])
+
+            resp = api_client.get("/memories")
+
+        memories = resp.json()
+        assert memories["total"] == 2
+        paths = {m["file_path"] for m in memories["memories"]}
+        assert paths == {"/test/one.txt", "/test/two.txt"}
+
+
 class TestQueryEndpoint:
     def test_query_empty_store(self, api_client):
         resp = api_client.post("/query", json={"question": "What is this?"})
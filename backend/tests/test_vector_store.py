@@ -1,19 +1,37 @@
+import importlib.util
 import sys
+import zlib
+from types import MappingProxyType
 from unittest.mock import MagicMock, patch
 
 import numpy as np
 import pytest
 
-try:
-    import chromadb  # noqa: F401
-
-    _chromadb_available = True
-except Exception:
-    _chromadb_available = False
+# find_spec checks the meta path without executing chromadb's heavy __init__,
+# so collecting unrelated tests stays cheap when chromadb is absent.
+_chromadb_available = importlib.util.find_spec("chromadb") is not None
 
 pytestmark = pytest.mark.skipif(
     not _chromadb_available,
-    reason="chromadb cannot be imported (pydantic v1 incompatible with Python 3.14+)",
+    reason="chromadb is not installed",
+)
+
+# Immutable base metadata shared by every test; _sample_metadata copies it and
+# applies per-test overrides. user_id matters: queries filter on it.
+_BASE_META = MappingProxyType(
+    {
+        "user_id": "default",
+        "file_path": "/test/a.pdf",
+        "file_name": "a.pdf",
+        "modality": "pdf",
+        "description": "Test document",
+        "category": "work",
+        "timestamp": "2025-01-01T00:00:00",
+        "file_date": "2025-01-01T00:00:00",
+        "has_events": False,
+        "summary": "Test",
+        "content_snippet": "Some content here.",
+    }
 )
 
 
@@ -27,26 +45,24 @@ class TestVectorStore:
 
     def _make_fake_embedder(self):
         fake = MagicMock()
-        fake.encode.side_effect = lambda text: (
-            np.random.RandomState(hash(text) % 2**31).rand(384).astype(np.float32)
+        # standard_normal supports dtype= natively, so the vector is built as
+        # float32 without an intermediate float64 array. crc32 gives a stable
+        # 32-bit seed — unlike hash(str), it ignores PYTHONHASHSEED, so the
+        # same text embeds identically across interpreter runs.
+        def _vec(text):
+            seed = zlib.crc32(text.encode("utf-8"))
+            return np.random.default_rng(seed).standard_normal(384, dtype=np.float32)
+
+        # Accept both a single string (embed_text) and a batch (embed_texts).
+        fake.encode.side_effect = lambda text, **kwargs: (
+            np.stack([_vec(t) for t in text]) if isinstance(text, list) else _vec(text)
         )
         return fake
 
     def _sample_metadata(self, **overrides):
-        base = {
-            "file_path": "/test/a.pdf",
-            "file_name": "a.pdf",
-            "modality": "pdf",
-            "description": "Test document",
-            "category": "work",
-            "timestamp": "2025-01-01T00:00:00",
-            "file_date": "2025-01-01T00:00:00",
-            "has_events": False,
-            "summary": "Test",
-            "content_snippet": "Some content here.",
-        }
-        base.update(overrides)
-        return base
+        d = dict(_BASE_META)
+        d.update(overrides)
+        return d
 
     def test_store_and_query(self, temp_chroma):
         self._reset_singletons()
@@ -87,18 +103,21 @@ class TestVectorStore:
         with patch("services.vector_store._embedder", fake_embedder):
             import services.vector_store as vs
 
-            for i, cat in enumerate(["work", "study", "work"]):
-                vs.store_document(
-                    f"doc{i}",
-                    f"Document {i}",
+            categories = ["work", "study", "work"]
+            vs.store_document_batch(
+                [f"doc{i}" for i in range(len(categories))],
+                [f"Document {i}" for i in range(len(categories))],
+                [
                     self._sample_metadata(
                         file_path=f"/test/{i}.pdf",
                         file_name=f"{i}.pdf",
                         category=cat,
                         description=f"Doc {i}",
                         summary=f"Doc {i}",
-                    ),
-                )
+                    )
+                    for i, cat in enumerate(categories)
+                ],
+            )
 
             work_memories = vs.get_all_memories(category="work")
             assert len(work_memories) == 2
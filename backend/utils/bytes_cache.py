@@ -0,0 +1,37 @@
+import hashlib
+from collections import OrderedDict
+from functools import wraps
+
+
+def cached_by_content(maxsize: int = 256, skip: tuple = ("",)):
+    """
+    LRU-cache a processor's output keyed by the SHA-256 of its input bytes.
+
+    Users re-ingest the same photos and recordings on retry or re-sync;
+    hashing the bytes (SHA-NI accelerated, microseconds) and returning the
+    cached result beats re-running a model forward pass by several orders of
+    magnitude. Results listed in `skip` (error sentinels) are never cached so
+    transient failures don't stick.
+    """
+
+    def decorator(func):
+        cache: OrderedDict[bytes, str] = OrderedDict()
+
+        @wraps(func)
+        def wrapper(file_bytes: bytes, *args, **kwargs):
+            key = hashlib.sha256(file_bytes).digest()
+            cached = cache.get(key)
+            if cached is not None:
+                cache.move_to_end(key)
+                return cached
+            result = func(file_bytes, *args, **kwargs)
+            if result not in skip:
+                cache[key] = result
+                if len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return result
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
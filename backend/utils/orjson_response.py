@@ -0,0 +1,20 @@
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    orjson-backed response used app-wide.
+
+    FastAPI's bundled ORJSONResponse only enables OPT_SERIALIZE_NUMPY; we also
+    need OPT_NON_STR_KEYS so graph payloads with int/None-keyed dicts
+    serialize without a pre-pass through jsonable_encoder.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )